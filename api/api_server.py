@@ -1,29 +1,111 @@
 import os
+import json
 import uuid
 import time
+import shutil
 import threading
-from fastapi import FastAPI, HTTPException, Path, Body, Header, UploadFile, File, Depends
+from fastapi import FastAPI, HTTPException, Path, Body, Header, UploadFile, File, Depends, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from typing import Any, Dict, List, Optional
+from firebase_admin import auth
+from google.api_core import exceptions as gexc
+from firebase_cli_app.core.jobs import JobManager, COMPLETED, FINISHED_STATES
+from firebase_cli_app.core.shared_state import SharedState, worker_identity
+from firebase_cli_app.core.client_pool import FirestoreClientPool
+from firebase_cli_app.core.firestore_utils import count_documents, batch_delete_collection, batch_copy_collection, firestore_json_default
+from firebase_cli_app.core.tree_scanner import scan_tree, scan_collection_group
+from firebase_cli_app.core.exporter import export_collection, MANIFEST_NAME
+from firebase_cli_app.core.sync import sync_collection
+from firebase_cli_app.core.search import parse_filter, search_page, SearchFilterError, SearchCursorError, SEARCH_PAGE_SIZE
+from firebase_cli_app.core.ui_helpers import parse_preview_fields
+from firebase_cli_app.core.audit import AuditLog, FileAuditSink, FirestoreAuditSink
+from firebase_cli_app.core.rate_control import controller_for, forget_controller, prune_controllers, backoff_delay, THROTTLING_ERRORS, TRANSIENT_ERRORS, MAX_RETRIES
 
 SERVICE_ACCOUNTS_DIR = os.path.join(os.path.dirname(__file__), 'service_accounts')
 os.makedirs(SERVICE_ACCOUNTS_DIR, exist_ok=True)
+EXPORTS_DIR = os.environ.get("FIREDASH_EXPORTS_DIR", os.path.join(os.path.dirname(__file__), 'exports'))
+# Shared by all worker processes on the node (gunicorn/uvicorn --workers)
+STATE_DB_PATH = os.environ.get("FIREDASH_STATE_DB", os.path.join(SERVICE_ACCOUNTS_DIR, 'firedash_state.db'))
+AUDIT_LOG_PATH = os.environ.get("FIREDASH_AUDIT_LOG", os.path.join(os.path.dirname(__file__), 'audit', 'audit.jsonl'))
+# When set, audit entries go to this collection in each tenant's own database instead of the local file
+AUDIT_COLLECTION = os.environ.get("FIREDASH_AUDIT_COLLECTION")
+SYNC_STATE_PATH = os.environ.get("FIREDASH_SYNC_STATE_DB", os.path.join(os.path.dirname(STATE_DB_PATH), 'firedash_sync.db'))
 
 app = FastAPI()
+state = SharedState(STATE_DB_PATH)
+jobs = JobManager(store=state)
+# Per-credential Firestore clients with capped, keepalive-tuned gRPC channels
+clients = FirestoreClientPool()
+
+# Service account files (and their registry entries) expire after 1 hour
+SERVICE_ACCOUNT_TTL_SECONDS = 3600
+# Export files hold tenant data: by default they do not outlive the tenant's key
+EXPORT_TTL_SECONDS = int(os.environ.get("FIREDASH_EXPORT_TTL_SECONDS", str(SERVICE_ACCOUNT_TTL_SECONDS)))
+SWEEP_INTERVAL_SECONDS = 300
+SWEEPER_LEASE = "service-account-sweeper"
+_sweeper_stop = threading.Event()
 
-# Background cleanup task to delete service account files older than 1 hour
 def cleanup_service_accounts():
+    for service_account_id, file_path in state.expired_tenants(SERVICE_ACCOUNT_TTL_SECONDS):
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+        state.remove_tenant(service_account_id)
+        clients.forget_tenant(service_account_id)
+        forget_controller(service_account_id)
+    # Files written before the registry existed (or by a crashed upload) are aged out by mtime
     now = time.time()
     for filename in os.listdir(SERVICE_ACCOUNTS_DIR):
         file_path = os.path.join(SERVICE_ACCOUNTS_DIR, filename)
-        if os.path.isfile(file_path):
+        # Only key files: the state database may live in this directory too
+        if filename.endswith(".json") and os.path.isfile(file_path):
             file_age = now - os.path.getmtime(file_path)
-            if file_age > 3600:  # 1 hour
+            if file_age > SERVICE_ACCOUNT_TTL_SECONDS:
                 os.remove(file_path)
-    threading.Timer(3600, cleanup_service_accounts).start()
-cleanup_service_accounts()
+
+def cleanup_exports():
+    if not os.path.isdir(EXPORTS_DIR):
+        return
+    now = time.time()
+    for job_id in os.listdir(EXPORTS_DIR):
+        out_dir = os.path.join(EXPORTS_DIR, job_id)
+        # The directory's mtime moves with every file written, last of all the manifest
+        if not os.path.isdir(out_dir) or now - os.path.getmtime(out_dir) < EXPORT_TTL_SECONDS:
+            continue
+        found = jobs.get_snapshot(job_id)
+        if found is not None and found[1]["status"] not in FINISHED_STATES:
+            continue
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+def run_sweeper():
+    # Every worker runs this loop, but only the lease holder actually sweeps
+    owner = worker_identity()
+    while not _sweeper_stop.is_set():
+        try:
+            if state.try_acquire_lease(SWEEPER_LEASE, owner, ttl=SWEEP_INTERVAL_SECONDS * 2):
+                cleanup_service_accounts()
+        except Exception:
+            pass
+        # Rate controllers and export files are per worker (or node), so every worker sweeps its own
+        prune_controllers(SERVICE_ACCOUNT_TTL_SECONDS)
+        try:
+            cleanup_exports()
+        except Exception:
+            pass
+        _sweeper_stop.wait(SWEEP_INTERVAL_SECONDS)
+    try:
+        state.release_lease(SWEEPER_LEASE, owner)
+    except Exception:
+        pass
+
+@app.on_event("startup")
+def start_sweeper():
+    threading.Thread(target=run_sweeper, name="firedash-sweeper", daemon=True).start()
+
+@app.on_event("startup")
+def start_audit():
+    audit.start()
 
 class DocumentModel(BaseModel):
     data: Dict[str, Any]
@@ -31,6 +113,80 @@ class DocumentModel(BaseModel):
 class RenameModel(BaseModel):
     new_name: str
 
+class ScanModel(BaseModel):
+    path: Optional[str] = None
+    collection_group: Optional[str] = None
+    count_only: bool = False
+
+class ExportModel(BaseModel):
+    partitions: int = 8
+    collection_group: bool = False
+
+class SyncModel(BaseModel):
+    target_service_account_id: str
+    target_collection: Optional[str] = None
+    delete_missing: bool = False
+    since_field: Optional[str] = None
+
+# Largest collections reported in a scan result
+SCAN_RESULT_LIMIT = 1000
+# Upper bound on hits streamed by a single search request; continue with next_cursor
+SEARCH_MAX_RESULTS = 5000
+
+def job_response(job):
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+def get_owned_job(job_id: str, service_account_id: str):
+    found = jobs.get_snapshot(job_id)
+    # Jobs are only visible to the service account that started them
+    if found is None or found[0] != service_account_id:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return found[1]
+
+def run_delete_collection(job, db, collection_name):
+    coll_ref = db.collection(collection_name)
+    limiter = controller_for(job.owner)
+    job.set_total(count_documents(coll_ref, limiter))
+    job.set_phase("deleting")
+    deleted = batch_delete_collection(coll_ref, job=job, limiter=limiter)
+    return {"collection": collection_name, "docs_deleted": deleted}
+
+def run_rename_collection(job, db, collection_name, new_name):
+    src_coll_ref = db.collection(collection_name)
+    new_coll_ref = db.collection(new_name)
+    limiter = controller_for(job.owner)
+    total = count_documents(src_coll_ref, limiter)
+    # Every document is processed twice: copied, then deleted from the source
+    job.set_total(total * 2 if total is not None else None)
+    job.set_phase("copying")
+    copied = batch_copy_collection(src_coll_ref, new_coll_ref, job=job, limiter=limiter)
+    job.set_phase("deleting")
+    deleted = batch_delete_collection(src_coll_ref, job=job, limiter=limiter)
+    return {"collection": collection_name, "new_name": new_name, "docs_copied": copied, "docs_deleted": deleted}
+
+def run_scan(job, db, path, collection_group, count_only):
+    job.set_phase("scanning")
+    if collection_group:
+        scan = scan_collection_group(db, collection_group, count_only=count_only, job=job, limiter=controller_for(job.owner))
+    else:
+        scan = scan_tree(db, path, count_only=count_only, job=job, limiter=controller_for(job.owner))
+    return scan.to_dict(limit=SCAN_RESULT_LIMIT)
+
+def run_export(job, db, collection_name, partitions, collection_group):
+    if not collection_group:
+        job.set_total(count_documents(db.collection(collection_name), controller_for(job.owner)))
+    out_dir = os.path.join(EXPORTS_DIR, job.id)
+    manifest = export_collection(db, collection_name, out_dir, partitions=partitions, collection_group=collection_group, job=job)
+    files = [MANIFEST_NAME] + [shard["file"] for shard in manifest["shards"]]
+    return {**manifest, "files": [f"/jobs/{job.id}/files/{name}" for name in files], "expires_in_seconds": EXPORT_TTL_SECONDS}
+
+def run_sync(job, src_db, dst_db, collection_name, target_collection, delete_missing, since_field, target_service_account_id):
+    job.set_phase("syncing")
+    # Writes land on the target and reads on the source, so each is throttled against its own tenant's budget
+    return sync_collection(src_db, dst_db, collection_name, target_collection, delete_missing=delete_missing,
+                           since_field=since_field, state_path=SYNC_STATE_PATH, job=job,
+                           limiter=controller_for(target_service_account_id), source_limiter=controller_for(job.owner))
+
 def verify_token(authorization: str) -> str:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
@@ -42,24 +198,61 @@ def verify_token(authorization: str) -> str:
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-def get_firestore_client(service_account_id: str):
+def get_tenant_file(service_account_id: str):
     if not service_account_id:
         raise HTTPException(status_code=400, detail="Missing X-Service-Account-ID header.")
-    # Find the file
-    for filename in os.listdir(SERVICE_ACCOUNTS_DIR):
-        if filename.startswith(service_account_id):
-            file_path = os.path.join(SERVICE_ACCOUNTS_DIR, filename)
-            break
-    else:
+    # The shared registry is the source of truth: another worker may have swept this tenant
+    file_path = state.get_tenant_file(service_account_id)
+    if not file_path or not os.path.isfile(file_path):
+        clients.forget_tenant(service_account_id)
+        forget_controller(service_account_id)
         raise HTTPException(status_code=404, detail="Service account file not found.")
-    app_name = f"app_{service_account_id}"
-    # Reuse app if it exists, otherwise create it
+    return file_path
+
+def get_firestore_client(service_account_id: str):
+    # Clients are built lazily, once per worker and credential, then reused across requests
+    return clients.get_client(service_account_id, get_tenant_file(service_account_id))
+
+def checkout_firestore_client(service_account_id: str):
+    # For work that can outlive the request: the pool keeps the channel open until released
+    return clients.checkout(service_account_id, get_tenant_file(service_account_id))
+
+def submit_tenant_job(kind, fn, service_account_ids, *args, owner):
+    """Queue fn(job, *clients, *args), holding one client lease per tenant until the job is over."""
+    leases = []
+    def release_all():
+        for lease in leases:
+            lease.release()
     try:
-        app_instance = firebase_admin.get_app(app_name)
-    except ValueError:
-        cred = credentials.Certificate(file_path)
-        app_instance = firebase_admin.initialize_app(cred, name=app_name)
-    return firestore.client(app_instance)
+        for tenant_id in service_account_ids:
+            leases.append(checkout_firestore_client(tenant_id))
+        return jobs.submit(kind, fn, *[lease.client for lease in leases], *args, owner=owner, on_finish=release_all)
+    except Exception:
+        release_all()
+        raise
+
+# Defined after get_firestore_client, which the Firestore sink needs
+audit = AuditLog(FirestoreAuditSink(get_firestore_client, AUDIT_COLLECTION) if AUDIT_COLLECTION else FileAuditSink(AUDIT_LOG_PATH))
+
+def warm_client(service_account_id: str, file_path: str):
+    try:
+        clients.warm(service_account_id, file_path)
+    except Exception:
+        # Invalid key files surface on first use, with a proper error response
+        pass
+
+def throttled_handler(request: Request, exc: Exception):
+    # Retries were exhausted; tell the client to back off instead of returning a generic 500
+    retry_after = max(1, int(backoff_delay(MAX_RETRIES)))
+    return JSONResponse(status_code=429, content={"detail": f"Firestore is throttling this tenant: {exc}"}, headers={"Retry-After": str(retry_after)})
+
+def unavailable_handler(request: Request, exc: Exception):
+    return JSONResponse(status_code=503, content={"detail": f"Firestore is temporarily unavailable: {exc}"}, headers={"Retry-After": "1"})
+
+for exc_type in THROTTLING_ERRORS:
+    app.add_exception_handler(exc_type, throttled_handler)
+for exc_type in TRANSIENT_ERRORS:
+    app.add_exception_handler(exc_type, unavailable_handler)
 
 @app.post("/service-account/upload")
 def upload_service_account(file: UploadFile = File(...)):
@@ -67,8 +260,14 @@ def upload_service_account(file: UploadFile = File(...)):
     unique_id = str(uuid.uuid4())
     filename = f"{unique_id}_{int(time.time())}.json"
     file_path = os.path.join(SERVICE_ACCOUNTS_DIR, filename)
-    with open(file_path, "wb") as f:
+    # Write then rename so other workers never see a partially written key file
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as f:
         f.write(file.file.read())
+    os.replace(tmp_path, file_path)
+    state.register_tenant(unique_id, file_path)
+    # Handshake in the background so the tenant's first real request skips it
+    threading.Thread(target=warm_client, args=(unique_id, file_path), daemon=True).start()
     return {"service_account_id": unique_id}
 
 @app.post("/collection")
@@ -83,22 +282,21 @@ def create_collection(
     if not name:
         raise HTTPException(status_code=400, detail="Missing collection name.")
     dummy_doc_id = "_init_"
-    db.collection(name).document(dummy_doc_id).set({"created": True, "created_by": user_id})
+    limiter = controller_for(service_account_id)
+    limiter.call(db.collection(name).document(dummy_doc_id).set, {"created": True, "created_by": user_id})
+    audit.record("create_collection", user_id, service_account_id, name)
     return {"message": f"Collection '{name}' created with dummy document by user {user_id}."}
 
-@app.delete("/collection/{collection_name}")
+@app.delete("/collection/{collection_name}", status_code=202)
 def delete_collection_endpoint(
     collection_name: str,
     authorization: str = Header(...),
     service_account_id: str = Header(None, alias="X-Service-Account-ID")
 ):
     user_id = verify_token(authorization)
-    db = get_firestore_client(service_account_id)
-    coll_ref = db.collection(collection_name)
-    docs = list(coll_ref.stream())
-    for doc in docs:
-        doc.reference.delete()
-    return {"message": f"Collection '{collection_name}' deleted by user {user_id}.", "docs_deleted": len(docs)}
+    job = submit_tenant_job("delete_collection", run_delete_collection, [service_account_id], collection_name, owner=service_account_id)
+    audit.record("delete_collection", user_id, service_account_id, collection_name, job_id=job.id)
+    return {"message": f"Deletion of collection '{collection_name}' started by user {user_id}.", **job_response(job)}
 
 @app.post("/collection/{collection_name}/document")
 def add_document(
@@ -109,8 +307,11 @@ def add_document(
 ):
     user_id = verify_token(authorization)
     db = get_firestore_client(service_account_id)
+    limiter = controller_for(service_account_id)
     doc_ref = db.collection(collection_name).document()
-    doc_ref.set({**doc.data, "created_by": user_id})
+    # The auto-ID is fixed client-side, so retrying this set cannot create duplicates
+    limiter.call(doc_ref.set, {**doc.data, "created_by": user_id})
+    audit.record("add_document", user_id, service_account_id, doc_ref.path, fields=sorted(doc.data))
     return {"message": f"Document created in '{collection_name}' by user {user_id}", "doc_id": doc_ref.id}
 
 @app.put("/collection/{collection_name}/document/{doc_id}")
@@ -123,10 +324,12 @@ def update_document(
 ):
     user_id = verify_token(authorization)
     db = get_firestore_client(service_account_id)
+    limiter = controller_for(service_account_id)
     doc_ref = db.collection(collection_name).document(doc_id)
-    if not doc_ref.get().exists:
+    if not limiter.call(doc_ref.get).exists:
         raise HTTPException(status_code=404, detail="Document not found.")
-    doc_ref.set({**doc.data, "updated_by": user_id}, merge=True)
+    limiter.call(doc_ref.set, {**doc.data, "updated_by": user_id}, merge=True)
+    audit.record("update_document", user_id, service_account_id, doc_ref.path, fields=sorted(doc.data))
     return {"message": f"Document '{doc_id}' updated in '{collection_name}' by user {user_id}"}
 
 @app.delete("/collection/{collection_name}/document/{doc_id}")
@@ -138,10 +341,12 @@ def delete_document(
 ):
     user_id = verify_token(authorization)
     db = get_firestore_client(service_account_id)
+    limiter = controller_for(service_account_id)
     doc_ref = db.collection(collection_name).document(doc_id)
-    if not doc_ref.get().exists:
+    if not limiter.call(doc_ref.get).exists:
         raise HTTPException(status_code=404, detail="Document not found.")
-    doc_ref.delete()
+    limiter.call(doc_ref.delete)
+    audit.record("delete_document", user_id, service_account_id, doc_ref.path)
     return {"message": f"Document '{doc_id}' deleted from '{collection_name}' by user {user_id}"}
 
 @app.get("/collection/{collection_name}")
@@ -153,10 +358,10 @@ def list_documents(
     user_id = verify_token(authorization)
     db = get_firestore_client(service_account_id)
     coll_ref = db.collection(collection_name)
-    docs = [ {"id": doc.id, **doc.to_dict()} for doc in coll_ref.stream() ]
+    docs = controller_for(service_account_id).call(lambda: [ {"id": doc.id, **doc.to_dict()} for doc in coll_ref.stream() ])
     return {"documents": docs, "requested_by": user_id}
 
-@app.post("/collection/{collection_name}/rename")
+@app.post("/collection/{collection_name}/rename", status_code=202)
 def rename_collection(
     collection_name: str,
     payload: RenameModel,
@@ -164,14 +369,162 @@ def rename_collection(
     service_account_id: str = Header(None, alias="X-Service-Account-ID")
 ):
     user_id = verify_token(authorization)
-    db = get_firestore_client(service_account_id)
     new_name = payload.new_name
     if not new_name:
         raise HTTPException(status_code=400, detail="Missing new collection name.")
-    src_coll_ref = db.collection(collection_name)
-    new_coll_ref = db.collection(new_name)
-    for doc in src_coll_ref.stream():
-        new_coll_ref.document(doc.id).set(doc.to_dict())
-    for doc in src_coll_ref.stream():
-        doc.reference.delete()
-    return {"message": f"Collection '{collection_name}' renamed to '{new_name}' by user {user_id}"} 
\ No newline at end of file
+    job = submit_tenant_job("rename_collection", run_rename_collection, [service_account_id], collection_name, new_name, owner=service_account_id)
+    audit.record("rename_collection", user_id, service_account_id, collection_name, new_name=new_name, job_id=job.id)
+    return {"message": f"Rename of collection '{collection_name}' to '{new_name}' started by user {user_id}", **job_response(job)}
+
+@app.post("/scan", status_code=202)
+def scan_tree_endpoint(
+    payload: ScanModel,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    user_id = verify_token(authorization)
+    target = payload.collection_group or payload.path or "/"
+    job = submit_tenant_job("scan", run_scan, [service_account_id], payload.path, payload.collection_group, payload.count_only, owner=service_account_id)
+    return {"message": f"Scan of '{target}' started by user {user_id}", **job_response(job)}
+
+@app.post("/collection/{collection_name}/export", status_code=202)
+def export_collection_endpoint(
+    collection_name: str,
+    payload: ExportModel = Body(ExportModel()),
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    user_id = verify_token(authorization)
+    if not 1 <= payload.partitions <= 1024:
+        raise HTTPException(status_code=400, detail="partitions must be between 1 and 1024.")
+    job = submit_tenant_job("export", run_export, [service_account_id], collection_name, payload.partitions, payload.collection_group, owner=service_account_id)
+    return {"message": f"Export of '{collection_name}' started by user {user_id}", **job_response(job)}
+
+@app.post("/collection/{collection_name}/sync", status_code=202)
+def sync_collection_endpoint(
+    collection_name: str,
+    payload: SyncModel,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    user_id = verify_token(authorization)
+    target = payload.target_collection or collection_name
+    job = submit_tenant_job("sync", run_sync, [service_account_id, payload.target_service_account_id], collection_name, target,
+                            payload.delete_missing, payload.since_field, payload.target_service_account_id, owner=service_account_id)
+    audit.record("sync_collection", user_id, service_account_id, collection_name, target_service_account_id=payload.target_service_account_id,
+                 target_collection=target, delete_missing=payload.delete_missing, job_id=job.id)
+    return {"message": f"Sync of '{collection_name}' to '{target}' started by user {user_id}", **job_response(job)}
+
+@app.get("/search/{group_id}")
+def search_collection_group(
+    group_id: str,
+    where: List[str] = Query([]),
+    limit: int = SEARCH_MAX_RESULTS,
+    page_size: int = SEARCH_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    """
+    Search every collection named group_id, at any depth. Hits are streamed as NDJSON
+    ({"path", "id", "data"} per line) followed by a final {"next_cursor": ...} line.
+    """
+    verify_token(authorization)
+    get_tenant_file(service_account_id)
+    if not 1 <= limit <= SEARCH_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_RESULTS}.")
+    if not 1 <= page_size <= 1000:
+        raise HTTPException(status_code=400, detail="page_size must be between 1 and 1000.")
+    try:
+        filters = [parse_filter(expression) for expression in where]
+    except SearchFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        field_paths = parse_preview_fields(fields) if fields else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    limiter = controller_for(service_account_id)
+    page_size = min(page_size, limit)
+    # Held until the stream ends: a long response must not lose its channel to pool eviction
+    lease = checkout_firestore_client(service_account_id)
+    db = lease.client
+    # Fetch the first page before streaming so bad filters or missing indexes still get an error status
+    try:
+        first_page = search_page(db, group_id, filters, page_size, cursor, field_paths, limiter)
+    except (ValueError, gexc.FailedPrecondition, gexc.InvalidArgument) as e:
+        # ValueError: the SDK rejected a field path (SearchCursorError is one too)
+        lease.release()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        lease.release()
+        raise
+
+    def stream_hits():
+        docs, next_cursor = first_page
+        returned = 0
+        while True:
+            for doc in docs:
+                line = {"path": doc.reference.path, "id": doc.id, "data": doc.to_dict()}
+                yield json.dumps(line, default=firestore_json_default) + "\n"
+                returned += 1
+            if next_cursor is None or returned >= limit:
+                break
+            try:
+                docs, next_cursor = search_page(db, group_id, filters, min(page_size, limit - returned),
+                                                next_cursor, field_paths, limiter)
+            except SearchCursorError as e:
+                # The last hit was deleted mid-stream; the status is already sent, so report it in-band
+                yield json.dumps({"next_cursor": None, "returned": returned, "error": str(e)}) + "\n"
+                return
+        yield json.dumps({"next_cursor": next_cursor, "returned": returned}) + "\n"
+
+    # Runs once the response is over, also when the client disconnects mid-stream
+    return StreamingResponse(stream_hits(), media_type="application/x-ndjson", background=BackgroundTask(lease.release))
+
+@app.get("/jobs/{job_id}")
+def get_job_status(
+    job_id: str,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    verify_token(authorization)
+    return get_owned_job(job_id, service_account_id)
+
+@app.get("/jobs/{job_id}/files/{filename}")
+def download_export_file(
+    job_id: str,
+    filename: str,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    verify_token(authorization)
+    job = get_owned_job(job_id, service_account_id)
+    if job["kind"] != "export" or job["status"] != COMPLETED:
+        raise HTTPException(status_code=404, detail="No finished export for this job.")
+    # Only names listed by the export itself, so the path can never leave the job's directory
+    allowed = {MANIFEST_NAME} | {shard["file"] for shard in job["result"]["shards"]}
+    file_path = os.path.join(EXPORTS_DIR, job_id, filename)
+    if filename not in allowed or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Export file not found; it may have expired.")
+    media_type = "application/json" if filename == MANIFEST_NAME else "application/x-ndjson"
+    return FileResponse(file_path, media_type=media_type, filename=filename)
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(
+    job_id: str,
+    authorization: str = Header(...),
+    service_account_id: str = Header(None, alias="X-Service-Account-ID")
+):
+    user_id = verify_token(authorization)
+    get_owned_job(job_id, service_account_id)
+    jobs.cancel(job_id)
+    audit.record("cancel_job", user_id, service_account_id, job_id)
+    return {"message": f"Cancellation of job '{job_id}' requested by user {user_id}", **get_owned_job(job_id, service_account_id)}
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    _sweeper_stop.set()
+    jobs.shutdown(wait=False)
+    # Flush queued audit entries before the worker exits
+    audit.stop() 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import json
+import time
 import typer
 from rich import print
 import warnings
@@ -33,29 +34,50 @@ ADMIN_EMAILS = [
 TOKEN_PATH = "token.json"
 
 from firebase_cli_app.core.firestore_utils import recursive_delete_by_path, delete_collection
-from firebase_cli_app.core.ui_helpers import show_instructions, show_collections_table, show_documents_table, show_fields_table, show_subcollections_table, explore_data
-from firebase_cli_app.core.auth_utils import authenticate_user, get_json_path, save_config, load_config, init_firebase
-from firebase_cli_app.core.firestore_browser import browse_firestore_collection
+from firebase_cli_app.core.ui_helpers import show_instructions, show_collections_table, show_documents_table, show_fields_table, show_subcollections_table, explore_data, parse_preview_fields
+from firebase_cli_app.core.auth_utils import authenticate_user, get_json_path, save_config, load_config, init_firebase, init_firebase_app
+from firebase_cli_app.core.firestore_browser import browse_firestore_collection, browse_search_results, preview_subtree
+from firebase_cli_app.core.snapshot_store import SnapshotStore, pull_collection, refresh_collection
+from firebase_cli_app.core.exporter import export_collection
+from firebase_cli_app.core.sync import sync_collection
+from firebase_cli_app.core.search import parse_filter, SearchFilterError
 
 # In setup_and_run, pass db to the browser
 @app.command()
-def setup_and_run():
+def setup_and_run(
+    snapshot: str = typer.Option(None, "--snapshot", help="Local snapshot file (SQLite) to pull collections into"),
+    offline: bool = typer.Option(False, "--offline", help="Browse the --snapshot file without any live reads"),
+    preview: str = typer.Option(None, "--preview", help="Comma-separated fields shown next to document IDs, e.g. title,timestamp"),
+):
     """
     One-time setup + interactive Firestore browser
     """
-    config = load_config()
-    if not config:
-        show_instructions()
-        oauth_path = get_json_path("\n📂 Upload your [Google OAuth] client_secrets.json")
-        admin_path = get_json_path("📂 Upload your [Firebase Admin SDK] serviceAccountKey.json")
-        save_config(oauth_path, admin_path)
+    store = SnapshotStore(snapshot) if snapshot else None
+    # Preview columns: --preview wins over the optional "preview_fields" list in config.json
+    try:
+        preview_fields = parse_preview_fields(preview if preview else load_config().get("preview_fields", []))
+    except ValueError as e:
+        print(f"[bold red]Invalid preview field: {e}[/bold red]")
+        raise typer.Exit()
+    if offline:
+        if store is None:
+            print("[bold red]--offline requires --snapshot PATH.[/bold red]")
+            raise typer.Exit()
+        db = store
     else:
-        oauth_path = config['client_secrets']
-        admin_path = config['service_account']
-    authenticate_user(oauth_path)
-    print("DEBUG: Authenticated user, initializing Firestore...")
-    db = init_firebase(admin_path)
-    print("DEBUG: Firestore initialized.")
+        config = load_config()
+        if not config:
+            show_instructions()
+            oauth_path = get_json_path("\n📂 Upload your [Google OAuth] client_secrets.json")
+            admin_path = get_json_path("📂 Upload your [Firebase Admin SDK] serviceAccountKey.json")
+            save_config(oauth_path, admin_path)
+        else:
+            oauth_path = config['client_secrets']
+            admin_path = config['service_account']
+        authenticate_user(oauth_path)
+        print("DEBUG: Authenticated user, initializing Firestore...")
+        db = init_firebase(admin_path)
+        print("DEBUG: Firestore initialized.")
     # List all collections
     def refresh_collections():
         return list(db.collections())
@@ -73,11 +95,112 @@ def setup_and_run():
             action_table.add_row("A", "Create Collection")
             action_table.add_row("B", "Rename Collection")
             action_table.add_row("C", "Delete Collection")
+            action_table.add_row("S", "Snapshot Collection to Local Store")
+            action_table.add_row("T", "Scan Tree Size")
+            action_table.add_row("E", "Export Collection (parallel, point-in-time)")
+            action_table.add_row("Y", "Sync Collection to Another Project")
+            action_table.add_row("F", "Find Documents Across Subcollections")
             action_table.add_row("Q", "Exit")
             print(action_table)
-            action = input("Select an action (A, B, C, Q): ").strip().upper()
+            action = input("Select an action (A, B, C, S, T, E, Y, F, Q): ").strip().upper()
             if action == "Q":
                 return
+            elif offline:
+                print("[bold yellow]Offline snapshot mode is read-only.[/bold yellow]")
+            elif action == "T":
+                scan_path = input("Enter a collection or document path to scan (leave blank for the whole database): ").strip().strip("/")
+                preview_subtree(db, scan_path, title="Tree Size")
+            elif action == "S":
+                if store is None:
+                    print("[bold red]Start with --snapshot PATH to enable local snapshots.[/bold red]")
+                    continue
+                snap_path = input("Enter collection number or path (e.g. users/abc/chats) to snapshot: ").strip().strip("/")
+                if not snap_path:
+                    print("[bold red]No collection entered.[/bold red]")
+                    continue
+                if snap_path.isdigit():
+                    snap_idx = int(snap_path) - 1
+                    if not (0 <= snap_idx < len(collections)):
+                        print("[bold red]Invalid collection number.[/bold red]")
+                        continue
+                    snap_path = collections[snap_idx].id
+                if len(snap_path.split("/")) % 2 == 0:
+                    print("[bold red]Path must point to a collection, not a document.[/bold red]")
+                    continue
+                mode = input("[F]ull pull or [D]elta refresh (only changed documents)? ").strip().upper()
+                try:
+                    if mode == "D":
+                        count = refresh_collection(db, store, snap_path)
+                        print(Panel(f"Snapshot of [bold]{snap_path}[/bold] refreshed ({count} changed documents fetched).", title="[bold green]Snapshot Refreshed[/bold green]", border_style="green"))
+                    else:
+                        count = pull_collection(db, store, snap_path)
+                        print(Panel(f"Snapshot of [bold]{snap_path}[/bold] stored ({count} documents).", title="[bold green]Snapshot Stored[/bold green]", border_style="green"))
+                except Exception as e:
+                    print(Panel(f"[bold red]Snapshot failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+            elif action == "E":
+                export_id = input("Enter collection number, path, or collection group ID to export: ").strip().strip("/")
+                if not export_id:
+                    print("[bold red]No collection entered.[/bold red]")
+                    continue
+                if export_id.isdigit():
+                    export_idx = int(export_id) - 1
+                    if not (0 <= export_idx < len(collections)):
+                        print("[bold red]Invalid collection number.[/bold red]")
+                        continue
+                    export_id = collections[export_idx].id
+                as_group = input(f"Export every '{export_id.split('/')[-1]}' collection in the database (collection group)? (y/N): ").strip().lower() == 'y'
+                partitions = input("Number of partitions [8]: ").strip()
+                partitions = int(partitions) if partitions.isdigit() and int(partitions) > 0 else 8
+                default_dir = f"export_{export_id.replace('/', '_')}_{int(time.time())}"
+                out_dir = input(f"Output directory [{default_dir}]: ").strip() or default_dir
+                try:
+                    manifest = export_collection(db, export_id, out_dir, partitions=partitions, collection_group=as_group)
+                    print(Panel(f"Exported [bold]{manifest['total_documents']}[/bold] documents from [bold]{export_id}[/bold] in {manifest['partitions']} shards as of {manifest['read_time']}.\nManifest: [bold]{os.path.join(out_dir, 'manifest.json')}[/bold]", title="[bold green]Export Complete[/bold green]", border_style="green"))
+                except Exception as e:
+                    print(Panel(f"[bold red]Export failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+            elif action == "Y":
+                sync_src = input("Enter collection number or path to sync from: ").strip().strip("/")
+                if not sync_src:
+                    print("[bold red]No collection entered.[/bold red]")
+                    continue
+                if sync_src.isdigit():
+                    sync_idx = int(sync_src) - 1
+                    if not (0 <= sync_idx < len(collections)):
+                        print("[bold red]Invalid collection number.[/bold red]")
+                        continue
+                    sync_src = collections[sync_idx].id
+                target_path = get_json_path("📂 Target project [Firebase Admin SDK] serviceAccountKey.json")
+                sync_dst = input(f"Target collection path [{sync_src}]: ").strip().strip("/") or sync_src
+                delete_missing = input("Also delete target documents that were removed from the source? (y/N): ").strip().lower() == 'y'
+                since_field = input("Timestamp field your app updates on every write, to list only recent changes (optional): ").strip() or None
+                try:
+                    target_db = init_firebase_app(target_path, "sync_target")
+                    result = sync_collection(db, target_db, sync_src, sync_dst, delete_missing=delete_missing, since_field=since_field)
+                    print(Panel(
+                        f"Listed {result['listed']}, fetched {result['fetched']}, wrote [bold]{result['written']}[/bold], "
+                        f"deleted {result['deleted']}, unchanged {result['unchanged']}.\nHigh-water mark: {result['high_water']}",
+                        title=f"[bold green]Synced {sync_src} → {sync_dst}[/bold green]", border_style="green"))
+                except Exception as e:
+                    print(Panel(f"[bold red]Sync failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+            elif action == "F":
+                group_id = input("Collection ID to search in every location (e.g. messages): ").strip().strip("/").split("/")[-1]
+                if not group_id:
+                    print("[bold red]No collection ID entered.[/bold red]")
+                    continue
+                print("Enter filters like [bold]status == \"open\"[/bold] or [bold]score >= 10[/bold], one per line; blank line to search.")
+                filters = []
+                while True:
+                    expression = input(f"Filter {len(filters) + 1}: ").strip()
+                    if not expression:
+                        break
+                    try:
+                        filters.append(parse_filter(expression))
+                    except SearchFilterError as e:
+                        print(f"[bold red]{e}[/bold red]")
+                try:
+                    browse_search_results(db, group_id, filters, preview_fields)
+                except Exception as e:
+                    print(Panel(f"[bold red]Search failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
             elif action == "A":
                 new_coll_name = input("Enter new collection name: ").strip()
                 if not new_coll_name:
@@ -106,6 +229,10 @@ def setup_and_run():
                 if any(c.id == new_coll_name for c in collections):
                     print(f"[bold red]A collection with name '{new_coll_name}' already exists.[/bold red]")
                     continue
+                preview_subtree(db, src_coll_ref.id, title="Data to Copy")
+                confirm = input(f"Rename collection '{src_coll_ref.id}' to '{new_coll_name}'? (y/N): ").strip().lower()
+                if confirm != 'y':
+                    continue
                 for doc in src_coll_ref.stream():
                     new_doc_ref = db.collection(new_coll_name).document(doc.id)
                     new_doc_ref.set(doc.to_dict())
@@ -133,6 +260,7 @@ def setup_and_run():
                 except ValueError:
                     print("[bold red]Invalid input.[/bold red]")
                     continue
+                preview_subtree(db, del_coll_ref.id)
                 confirm = input(f"Are you sure you want to delete collection '{del_coll_ref.id}' and all its documents? (y/N): ").strip().lower()
                 if confirm != 'y':
                     continue
@@ -146,32 +274,13 @@ def setup_and_run():
                 if 1 <= coll_choice <= len(collections):
                     coll_ref = collections[coll_choice-1]
                     current_path = f"/{coll_ref.id}"
-                    browse_firestore_collection(coll_ref, current_path, db)
+                    browse_firestore_collection(coll_ref, current_path, db, preview_fields)
                     current_path = "/"
                 else:
                     print("[bold red]Invalid collection number.[/bold red]")
             except ValueError:
                 print("[bold red]Invalid input.[/bold red]")
 
-def is_basic_type(val):
-    return isinstance(val, (str, int, float, bool)) or val is None
-
-def summarize_dict_item(item):
-    if not isinstance(item, dict):
-        return str(item)
-    if 'title' in item:
-        return f"title: {item['title']}" + (f" (timestamp: {item.get('timestamp')})" if 'timestamp' in item else "")
-    if 'timestamp' in item:
-        return f"timestamp: {item['timestamp']}"
-    if 'content' in item:
-        content = item['content']
-        if isinstance(content, str):
-            return f"content: {content[:30]}..."
-    if item:
-        k, v = next(iter(item.items()))
-        return f"{k}: {str(v)[:30]}..."
-    return "[dict]"
-
 def rename_document_with_subcollections(doc_ref, new_doc_ref):
     # Copy fields
     data = doc_ref.get().to_dict()
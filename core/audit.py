@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+from firebase_cli_app.core.rate_control import retry_call
+
+AUDIT_QUEUE_SIZE = int(os.environ.get("FIREDASH_AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL_SECONDS = 2.0
+# A batch the sink keeps rejecting is dropped after this many attempts
+AUDIT_MAX_ATTEMPTS = 3
+
+
+# Sinks implement write(entries): raise to have the whole batch retried, or return the entries
+# that could not be stored so only those are retried.
+
+
+class FileAuditSink:
+    """Append-only JSON Lines file; one write per batch so concurrent workers never interleave lines."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, entries):
+        payload = "".join(json.dumps(entry, default=str) + "\n" for entry in entries).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class FirestoreAuditSink:
+    """
+    Writes each tenant's entries into a collection of that tenant's own database. Tenants are
+    committed independently, and entries are stored under their own ID so a retry overwrites
+    instead of duplicating.
+    """
+
+    def __init__(self, client_for_tenant, collection):
+        self.client_for_tenant = client_for_tenant
+        self.collection = collection
+
+    def write(self, entries):
+        by_tenant = {}
+        for entry in entries:
+            by_tenant.setdefault(entry.get("tenant"), []).append(entry)
+        failed = []
+        for tenant, tenant_entries in by_tenant.items():
+            try:
+                db = self.client_for_tenant(tenant)
+                batch = db.batch()
+                coll_ref = db.collection(self.collection)
+                for entry in tenant_entries:
+                    batch.set(coll_ref.document(entry["id"]), entry)
+                retry_call(batch.commit)
+            except Exception:
+                failed.extend(tenant_entries)
+        return failed
+
+
+class AuditLog:
+    """
+    Mutations are recorded into a bounded in-memory queue (never blocking the request) and
+    flushed in batches by a background thread. When the queue is full entries are dropped
+    and counted rather than slowing callers down.
+    """
+
+    def __init__(self, sink, max_queue=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL_SECONDS):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="firedash-audit", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def record(self, action, user_id=None, tenant=None, target=None, **details):
+        entry = {
+            "id": uuid.uuid4().hex,
+            "timestamp": time.time(),
+            "action": action,
+            "user_id": user_id,
+            "tenant": tenant,
+            "target": target,
+        }
+        if details:
+            entry["details"] = details
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def stop(self, timeout=10.0):
+        """Flush everything still queued, then stop the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+
+    def _take_batch(self, wait):
+        # Collect up to batch_size entries, or whatever arrives within `wait` seconds
+        batch = []
+        deadline = time.monotonic() + wait if wait else None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is None:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    break
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch):
+        for attempt in range(AUDIT_MAX_ATTEMPTS):
+            try:
+                batch = self.sink.write(batch) or []
+            except Exception:
+                pass
+            if not batch:
+                return
+            time.sleep(min(2 ** attempt * 0.1, 1.0))
+        with self._lock:
+            self.failed += len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._deliver(batch)
+        # Shutdown: drain whatever is left
+        while True:
+            batch = self._take_batch(None)
+            if not batch:
+                return
+            self._deliver(batch)
@@ -102,4 +102,17 @@ def init_firebase(service_account_path):
         firebase_admin.get_app()
     except ValueError:
         firebase_admin.initialize_app(cred)
-    return firestore.client() 
\ No newline at end of file
+    return firestore.client()
+
+def init_firebase_app(service_account_path, name):
+    # Named app so a second project (e.g. a sync target) can be open next to the default one.
+    # The key's identity is part of the name: a different key must never reuse an app built for another.
+    with open(service_account_path, 'r') as f:
+        info = json.load(f)
+    app_name = f"{name}:{info.get('project_id')}:{info.get('client_email')}:{info.get('private_key_id')}"
+    try:
+        app_instance = firebase_admin.get_app(app_name)
+    except ValueError:
+        cred = credentials.Certificate(service_account_path)
+        app_instance = firebase_admin.initialize_app(cred, name=app_name)
+    return firestore.client(app_instance)
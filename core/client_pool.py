@@ -0,0 +1,215 @@
+import os
+import json
+import logging
+import threading
+import itertools
+from collections import OrderedDict
+from firebase_admin import credentials
+from google.cloud import firestore as gcloud_firestore
+
+CHANNELS_PER_CREDENTIAL = int(os.environ.get("FIREDASH_CHANNELS_PER_CREDENTIAL", "2"))
+MAX_LIVE_CHANNELS = int(os.environ.get("FIREDASH_MAX_CHANNELS", "128"))
+GRPC_KEEPALIVE_MS = int(os.environ.get("FIREDASH_GRPC_KEEPALIVE_MS", "30000"))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.environ.get("FIREDASH_GRPC_KEEPALIVE_TIMEOUT_MS", "10000"))
+# Evicted channels are closed after a grace period so in-flight requests can finish, and
+# never while a lease (e.g. a long-running job) still uses them
+EVICTION_GRACE_SECONDS = 30
+WARMUP_TIMEOUT_SECONDS = 10
+
+logger = logging.getLogger(__name__)
+
+
+def credential_key(file_path):
+    """Identity of a service account key; tenants uploading the same key share clients."""
+    with open(file_path, "r") as f:
+        info = json.load(f)
+    return (info.get("project_id"), info.get("client_email"), info.get("private_key_id"))
+
+
+def _channel_options():
+    return [
+        ("grpc.keepalive_time_ms", GRPC_KEEPALIVE_MS),
+        ("grpc.keepalive_timeout_ms", GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1),
+    ]
+
+
+class _PooledClients:
+    def __init__(self, clients):
+        self.clients = clients
+        self._cycle = itertools.cycle(clients)
+        self._lock = threading.Lock()
+        self.users = 0
+        self.retired = False
+        self.grace_over = False
+        self.closed = False
+
+    def next(self):
+        return next(self._cycle)
+
+    def acquire(self):
+        with self._lock:
+            self.users += 1
+            return self.next()
+
+    def release(self):
+        with self._lock:
+            self.users -= 1
+        self._close_if_unused()
+
+    def retire(self):
+        """Out of the pool: close once the grace period is over and the last lease is released."""
+        with self._lock:
+            if self.retired:
+                return
+            self.retired = True
+        timer = threading.Timer(EVICTION_GRACE_SECONDS, self._end_grace)
+        timer.daemon = True
+        timer.start()
+
+    def _end_grace(self):
+        with self._lock:
+            self.grace_over = True
+        self._close_if_unused()
+
+    def _close_if_unused(self):
+        with self._lock:
+            if self.closed or not (self.retired and self.grace_over) or self.users > 0:
+                return
+            self.closed = True
+        for client in self.clients:
+            try:
+                client.close()
+            except Exception:
+                channel = _client_channel(client)
+                if channel is not None:
+                    channel.close()
+
+
+class ClientLease:
+    """A pooled client held past a single request; the pool keeps its channel open until release()."""
+
+    def __init__(self, entry):
+        self._entry = entry
+        self.client = entry.acquire()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._entry.release()
+
+    def __enter__(self):
+        return self.client
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class FirestoreClientPool:
+    def __init__(self, channels_per_credential=CHANNELS_PER_CREDENTIAL, max_channels=MAX_LIVE_CHANNELS):
+        self.channels_per_credential = max(1, channels_per_credential)
+        self.max_channels = max(self.channels_per_credential, max_channels)
+        self._entries = OrderedDict()
+        self._tenant_keys = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, tenant_id, file_path):
+        """A client for one request; it stays usable for EVICTION_GRACE_SECONDS after eviction."""
+        return self._entry_for(tenant_id, file_path).next()
+
+    def checkout(self, tenant_id, file_path):
+        """A ClientLease for work that may outlive the grace period, such as background jobs."""
+        return ClientLease(self._entry_for(tenant_id, file_path))
+
+    def _entry_for(self, tenant_id, file_path):
+        key = self._tenant_keys.get(tenant_id)
+        if key is None:
+            key = credential_key(file_path)
+        with self._lock:
+            self._tenant_keys[tenant_id] = key
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        # Build outside the lock: credential loading and channel setup are slow
+        entry = _PooledClients([self._build_client(file_path) for _ in range(self.channels_per_credential)])
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # Another thread won the race; keep its channels
+                entry.retire()
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = entry
+            self._evict_over_cap()
+            return entry
+
+    def warm(self, tenant_id, file_path):
+        """Create the tenant's channels and complete the TLS/gRPC handshake ahead of the first request."""
+        self.get_client(tenant_id, file_path)
+        with self._lock:
+            entry = self._entries.get(self._tenant_keys[tenant_id])
+        if entry is None:
+            return
+        for client in entry.clients:
+            channel = _client_channel(client)
+            if channel is None:
+                continue
+            try:
+                import grpc
+                grpc.channel_ready_future(channel).result(timeout=WARMUP_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+
+    def forget_tenant(self, tenant_id):
+        with self._lock:
+            key = self._tenant_keys.pop(tenant_id, None)
+            if key is None or key in self._tenant_keys.values():
+                return
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.retire()
+
+    def live_channels(self):
+        with self._lock:
+            return sum(len(entry.clients) for entry in self._entries.values())
+
+    def _evict_over_cap(self):
+        # Caller holds the lock; least recently used credentials go first
+        live = sum(len(entry.clients) for entry in self._entries.values())
+        while live > self.max_channels and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            live -= len(entry.clients)
+            entry.retire()
+
+    def _build_client(self, file_path):
+        cred = credentials.Certificate(file_path)
+        google_cred = cred.get_credential()
+        client = gcloud_firestore.Client(project=cred.project_id, credentials=google_cred)
+        try:
+            # Install a transport with our channel options instead of the SDK defaults
+            from google.cloud.firestore_v1.services.firestore import client as firestore_client
+            from google.cloud.firestore_v1.services.firestore.transports import grpc as firestore_grpc
+            channel = firestore_grpc.FirestoreGrpcTransport.create_channel(
+                client._target, credentials=google_cred, options=_channel_options()
+            )
+            transport = firestore_grpc.FirestoreGrpcTransport(host=client._target, channel=channel)
+            client._firestore_api_internal = firestore_client.FirestoreClient(
+                transport=transport, client_info=client._client_info
+            )
+        except Exception as e:
+            # Older/newer SDK layouts: fall back to the default lazily created channel
+            logger.warning(
+                "Could not install a custom Firestore transport (%s); keepalive and channel options "
+                "are not applied and the SDK default channel is used.", e
+            )
+        return client
+
+
+def _client_channel(client):
+    api = getattr(client, "_firestore_api_internal", None)
+    transport = getattr(api, "_transport", None) or getattr(api, "transport", None)
+    return getattr(transport, "grpc_channel", None)
@@ -0,0 +1,84 @@
+import json
+from rich.console import Console
+from rich.table import Table
+import firebase_admin.firestore as firestore
+
+console = Console()
+
+# Sentinel for staged deletes; firestore.DELETE_FIELD is only substituted at commit time
+_DELETED = object()
+
+
+def parse_field_value(raw):
+    # Same convention as the rest of the editor: JSON if it parses, plain string otherwise
+    try:
+        return json.loads(raw)
+    except Exception:
+        return raw
+
+
+def _display(value):
+    if value is _DELETED:
+        return "[red](deleted)[/red]"
+    if isinstance(value, (dict, list)):
+        return "[View]"
+    return str(value)
+
+
+class EditBuffer:
+    """Field changes staged locally and written back as a single precondition-guarded update."""
+
+    def __init__(self):
+        self.changes = {}
+
+    def __len__(self):
+        return len(self.changes)
+
+    def stage_set(self, field_name, value):
+        self.changes[field_name] = value
+
+    def stage_delete(self, field_name):
+        self.changes[field_name] = _DELETED
+
+    def clear(self):
+        self.changes = {}
+
+    def apply(self, data):
+        """The document as it will look once the buffer is committed."""
+        result = dict(data or {})
+        for field_name, value in self.changes.items():
+            if value is _DELETED:
+                result.pop(field_name, None)
+            else:
+                result[field_name] = value
+        return result
+
+    def show_preview(self, data):
+        table = Table(title=f"[bold blue]Staged Changes ({len(self.changes)})[/bold blue]", show_header=True, header_style="bold blue")
+        table.add_column("Field", style="bold")
+        table.add_column("Current", style="dim")
+        table.add_column("Staged", style="yellow")
+        data = data or {}
+        for field_name, value in self.changes.items():
+            current = _display(data[field_name]) if field_name in data else "[dim](new)[/dim]"
+            table.add_row(field_name, current, _display(value))
+        if not self.changes:
+            table.add_row("-", "(no staged changes)", "")
+        console.print(table)
+
+    def commit(self, doc_ref, last_update_time=None):
+        """
+        Write all staged changes in one update RPC. With last_update_time the write fails
+        (FailedPrecondition) if someone else changed the document since it was read.
+        Returns the WriteResult; its update_time is the new precondition.
+        """
+        # Staged names are literal top-level keys (as apply() treats them); update() would
+        # otherwise read "profile.name" as a nested path
+        payload = {
+            firestore.FieldPath(field_name).to_api_repr(): firestore.DELETE_FIELD if value is _DELETED else value
+            for field_name, value in self.changes.items()
+        }
+        option = None
+        if last_update_time is not None:
+            option = doc_ref._client.write_option(last_update_time=last_update_time)
+        return doc_ref.update(payload, option=option)
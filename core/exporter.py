@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from firebase_cli_app.core.firestore_utils import firestore_json_default
+
+EXPORT_WORKERS = int(os.environ.get("FIREDASH_EXPORT_WORKERS", "8"))
+MANIFEST_NAME = "manifest.json"
+# Progress is reported to the job every this many documents per partition
+PROGRESS_EVERY = 500
+
+
+def consistent_read_time():
+    """
+    A read time for point-in-time reads. Firestore serves any microsecond in the last hour;
+    whole minutes also work for older reads when point-in-time recovery is enabled, so an
+    export that outlives the hour still reads a consistent snapshot on PITR databases.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(second=0, microsecond=0)
+
+
+def _partition_queries(group_query, partitions, read_time):
+    try:
+        parts = group_query.get_partitions(partitions, read_time=read_time)
+    except TypeError:
+        # Older SDKs take no read_time here; boundaries are still valid for the read below
+        parts = group_query.get_partitions(partitions)
+    return list(parts)
+
+
+def _key(ref):
+    # Firestore orders document names segment by segment
+    return tuple(ref.path.split("/"))
+
+
+def _edge_document(db, collection_path, direction, read_time):
+    query = db.collection(collection_path).order_by("__name__", direction=direction).limit(1)
+    docs = list(_stream_at(query, read_time))
+    return docs[0].reference if docs else None
+
+
+def _clamped_queries(db, group_id, parts, collection_path, read_time):
+    """
+    Partition queries narrowed to the key range of one collection, from its first to its last
+    document, so partitions covering other same-named collections are skipped, not streamed.
+    """
+    first = _edge_document(db, collection_path, "ASCENDING", read_time)
+    last = _edge_document(db, collection_path, "DESCENDING", read_time)
+    if first is None or last is None:
+        return []
+    queries = []
+    for part in parts:
+        start, end = part.start_at, part.end_at
+        # Partition ranges are [start_at, end_at); None means unbounded
+        if start is not None and _key(start) > _key(last):
+            continue
+        if end is not None and _key(end) <= _key(first):
+            continue
+        query = db.collection_group(group_id).order_by("__name__")
+        query = query.start_at([start if start is not None and _key(start) > _key(first) else first])
+        if end is not None and _key(end) <= _key(last):
+            query = query.end_before([end])
+        else:
+            query = query.end_at([last])
+        queries.append(query)
+    return queries
+
+
+def _stream_at(query, read_time):
+    try:
+        return query.stream(read_time=read_time)
+    except TypeError:
+        raise RuntimeError("This google-cloud-firestore version does not support read_time; upgrade to export a consistent snapshot.")
+
+
+def _export_partition(index, query, out_dir, read_time, parent_path, job):
+    filename = f"part-{index:05d}.ndjson"
+    documents = size = pending = 0
+    with open(os.path.join(out_dir, filename), "w") as f:
+        for doc in _stream_at(query, read_time):
+            path = doc.reference.path
+            # Collection-group partitions also cover nested collections with the same ID
+            if parent_path is not None and path.rsplit("/", 1)[0] != parent_path:
+                continue
+            line = json.dumps({
+                "path": path,
+                "id": doc.id,
+                "update_time": doc.update_time.isoformat() if doc.update_time else None,
+                "data": doc.to_dict(),
+            }, default=firestore_json_default)
+            f.write(line + "\n")
+            documents += 1
+            size += len(line) + 1
+            pending += 1
+            if job is not None and pending >= PROGRESS_EVERY:
+                job.advance(pending)
+                pending = 0
+    if job is not None and pending:
+        job.advance(pending)
+    return {"file": filename, "documents": documents, "bytes": size}
+
+
+def export_collection(db, collection_id, out_dir, partitions=8, max_workers=EXPORT_WORKERS,
+                      collection_group=False, read_time=None, job=None):
+    """
+    Export a collection (or every collection with that ID, when collection_group is set) as
+    sharded NDJSON plus a manifest. All partitions read at the same read_time, in parallel.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    read_time = read_time or consistent_read_time()
+    # Partition queries only exist for collection groups; a single collection is exported
+    # through its group, clamped to the collection's key range and filtered to direct children.
+    parent_path = None if collection_group else collection_id.strip("/")
+    group_id = collection_id.strip("/").split("/")[-1]
+    if job is not None:
+        job.set_phase("partitioning")
+    parts = _partition_queries(db.collection_group(group_id), partitions, read_time)
+    if collection_group:
+        queries = [part.query() for part in parts]
+    else:
+        queries = _clamped_queries(db, group_id, parts, parent_path, read_time)
+    if job is not None:
+        job.set_phase("exporting")
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firedash-export") as executor:
+        futures = [
+            executor.submit(_export_partition, index, query, out_dir, read_time, parent_path, job)
+            for index, query in enumerate(queries)
+        ]
+        shards = [future.result() for future in futures]
+    manifest = {
+        "collection": collection_id,
+        "collection_group": collection_group,
+        "project": getattr(db, "project", None),
+        "read_time": read_time.isoformat(),
+        "partitions": len(shards),
+        "total_documents": sum(shard["documents"] for shard in shards),
+        "total_bytes": sum(shard["bytes"] for shard in shards),
+        "duration_seconds": round(time.time() - started, 1),
+        "shards": shards,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
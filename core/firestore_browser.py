@@ -1,17 +1,229 @@
 from rich.console import Console
 from rich.panel import Panel
-from firebase_cli_app.core.ui_helpers import show_documents_table, show_fields_table, show_subcollections_table, explore_data
+from firebase_cli_app.core.ui_helpers import show_documents_table, show_fields_table, show_subcollections_table, explore_data, show_scan_table, show_search_results_table, parse_preview_fields
 from firebase_cli_app.core.firestore_utils import recursive_delete_by_path, delete_collection
+from firebase_cli_app.core.tree_scanner import scan_tree
+from firebase_cli_app.core.edit_buffer import EditBuffer, parse_field_value
+from firebase_cli_app.core.search import search_page, SearchCursorError, SEARCH_PAGE_SIZE
+from google.api_core.exceptions import FailedPrecondition
 from rich.table import Table
-import json
-import firebase_admin.firestore as firestore
 
 console = Console()
+# Documents listed per page in the collection view
+PAGE_SIZE = 25
 
-def browse_firestore_collection(collection_ref, path="", db=None):
+def preview_subtree(db, path, title="Affected Data"):
+    # Shown before destructive actions so the blast radius is visible up front
+    display_path = path or "/"
+    console.print(f"[dim]Scanning [bold]{display_path}[/bold]...[/dim]")
+    try:
+        scan = scan_tree(db, path)
+    except Exception as e:
+        console.print(Panel(f"[bold red]Could not scan {display_path}: {e}[/bold red]", title="[bold red]Scan Error[/bold red]", border_style="red"))
+        return None
+    show_scan_table(scan, title=f"{title}: {display_path}")
+    return scan
+
+def fetch_document_page(collection_ref, preview_fields=None, start_after=None, page_size=PAGE_SIZE):
+    # Projected query: only the preview fields (or just IDs) of one page are read over the wire
+    query = collection_ref.select(preview_fields or []).order_by("__name__").limit(page_size + 1)
+    if start_after is not None:
+        query = query.start_after(start_after)
+    docs = list(query.stream())
+    return docs[:page_size], len(docs) > page_size
+
+def browse_document(collection_ref, doc_id, path="", db=None, preview_fields=None):
+    """Document view (fields, subcollections, edits). Returns True if the document was deleted."""
+    read_only = getattr(collection_ref, "read_only", False)
+    doc_ref = collection_ref.document(doc_id)
+    # The listing only carries projected fields; read the full document once it is opened
+    doc = doc_ref.get()
+    data = doc.to_dict() or {}
+    # Precondition for staged edits: commits fail if the document changed after this read
+    update_time = doc.update_time
+    staged = EditBuffer()
+    subcolls = list(doc_ref.collections())
+    # Remove the Document Details panel
+    # Only show the current path panel and the combined table
+    while True:
+        console.print(Panel(f"[bold yellow]You are here: [/] [bold green]{path}/{doc.id}[/]", title="Current Firestore Path", border_style="cyan"))
+        # Build a combined list of fields (with [View]) and subcollections
+        fields = list(data.items()) if data else []
+        subcolls = list(doc_ref.collections())
+        menu_items = []
+        for idx, (k, v) in enumerate(fields, 1):
+            if isinstance(v, (dict, list)):
+                menu_items.append((f"{k}", "[View]", "field", k))
+            else:
+                menu_items.append((f"{k}", str(v), "field", k))
+        for sidx, subcoll in enumerate(subcolls, len(fields) + 1):
+            menu_items.append((subcoll.id, "(subcollection)", "subcoll", subcoll.id))
+        # Display only the combined table
+        table = Table(title="[bold green]Fields & Subcollections[/bold green]", show_header=True, header_style="bold green")
+        table.add_column("#", style="dim", width=4)
+        table.add_column("Name", style="bold yellow")
+        table.add_column("Value", style="yellow")
+        for idx, (name, value, typ, key) in enumerate(menu_items, 1):
+            table.add_row(str(idx), name, value)
+        if not menu_items:
+            table.add_row("-", "(none)", "")
+        console.print(table)
+        # Prompt for navigation or actions
+        user_input = input("Enter a number to view, 0 to go back, or press Enter for actions: ").strip()
+        if user_input == "0":
+            return False
+        if user_input == "" and read_only:
+            console.print("[bold yellow]Snapshot mode is read-only.[/bold yellow]")
+            user_input = input("Enter a number to view, or 0 to go back: ").strip()
+            if user_input in ("", "0"):
+                break
+        if user_input == "":
+            # Show action menu
+            action_table = Table(title="[bold blue]Actions[/bold blue]", show_header=False)
+            action_table.add_column("Key", style="bold magenta", width=4)
+            action_table.add_column("Action", style="bold")
+            action_table.add_row("E", "Edit (fields, subcollections, rename)")
+            action_table.add_row("D", "Delete Document")
+            action_table.add_row("Q", "Back")
+            console.print(action_table)
+            while True:
+                action_choice = input("Select an action (E/D/Q): ").strip().upper()
+                if action_choice == "Q":
+                    # Just break out of the actions menu, not the document view
+                    break
+                elif action_choice == "D":
+                    preview_subtree(db, f"{path.strip('/')}/{doc.id}")
+                    confirm = input(f"Are you sure you want to delete document '{doc.id}'? (y/N): ").strip().lower()
+                    if confirm == 'y':
+                        # Full path: search results can open documents nested anywhere in the tree
+                        recursive_delete_by_path(db, doc_ref.path)
+                        console.print(Panel(f"Document [bold]{doc.id}[/bold] deleted (including all subcollections).", title="[bold red]Deleted[/bold red]", border_style="red"))
+                        return True
+                elif action_choice == "E":
+                    # Edit submenu (same as before)
+                    while True:
+                        edit_table = Table(title="[bold blue]Edit Document[/bold blue]", show_header=False)
+                        edit_table.add_column("Key", style="bold magenta", width=4)
+                        edit_table.add_column("Action", style="bold")
+                        edit_table.add_row("A", "Add Field (staged)")
+                        edit_table.add_row("F", "Edit/Delete Field (staged)")
+                        edit_table.add_row("P", f"Preview Staged Changes ({len(staged)})")
+                        edit_table.add_row("C", "Commit Staged Changes")
+                        edit_table.add_row("X", "Discard Staged Changes")
+                        edit_table.add_row("R", "Rename Document")
+                        edit_table.add_row("B", "Back")
+                        console.print(edit_table)
+                        edit_choice = input("Select an edit action (A/F/P/C/X/R/B): ").strip().upper()
+                        if edit_choice == "B":
+                            if staged:
+                                console.print(f"[bold yellow]{len(staged)} staged change(s) not committed yet. Commit (C) or discard (X) them first.[/bold yellow]")
+                                continue
+                            break
+                        elif edit_choice == "A":
+                            field_name = input("Enter new field name: ").strip()
+                            if not field_name:
+                                console.print("[bold red]No field name entered.[/bold red]")
+                                continue
+                            field_value = input(f"Enter value for '{field_name}': ")
+                            staged.stage_set(field_name, parse_field_value(field_value))
+                            console.print(f"[green]Field [bold]{field_name}[/bold] staged.[/green]")
+                        elif edit_choice == "F":
+                            field_name = input("Enter field name to edit/delete: ").strip()
+                            if not field_name or field_name not in staged.apply(data):
+                                console.print("[bold red]Invalid or missing field name.[/bold red]")
+                                continue
+                            subedit = input("[E]dit or [D]elete this field? ").strip().upper()
+                            if subedit == "E":
+                                new_val = input(f"Enter new value for '{field_name}': ")
+                                staged.stage_set(field_name, parse_field_value(new_val))
+                                console.print(f"[green]Field [bold]{field_name}[/bold] update staged.[/green]")
+                            elif subedit == "D":
+                                staged.stage_delete(field_name)
+                                console.print(f"[red]Field [bold]{field_name}[/bold] delete staged.[/red]")
+                            else:
+                                console.print("[bold red]Invalid choice.[/bold red]")
+                        elif edit_choice == "P":
+                            staged.show_preview(data)
+                        elif edit_choice == "X":
+                            staged.clear()
+                            console.print("[bold yellow]Staged changes discarded.[/bold yellow]")
+                        elif edit_choice == "C":
+                            if not staged:
+                                console.print("[bold yellow]Nothing staged.[/bold yellow]")
+                                continue
+                            staged.show_preview(data)
+                            try:
+                                write_result = staged.commit(doc_ref, last_update_time=update_time)
+                            except FailedPrecondition:
+                                console.print(Panel("[bold red]The document was changed by someone else since it was loaded.[/bold red] Your staged changes are kept; reload to see the latest version.", title="[bold red]Conflict[/bold red]", border_style="red"))
+                                if input("Reload the document now? (y/N): ").strip().lower() == 'y':
+                                    latest = doc_ref.get()
+                                    data = latest.to_dict() or {}
+                                    update_time = latest.update_time
+                                    staged.show_preview(data)
+                                continue
+                            except Exception as e:
+                                console.print(Panel(f"[bold red]Commit failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+                                continue
+                            # Refresh the local view from the write itself instead of re-reading the document
+                            data = staged.apply(data)
+                            update_time = write_result.update_time
+                            console.print(Panel(f"{len(staged)} field change(s) committed in one write.", title="[bold green]Success[/bold green]", border_style="green"))
+                            staged.clear()
+                        elif edit_choice == "R":
+                            new_id = input("Enter new document ID: ").strip()
+                            if not new_id:
+                                console.print("[bold red]No ID entered. Rename cancelled.[/bold red]")
+                                continue
+                            new_doc_ref = collection_ref.document(new_id)
+                            if new_doc_ref.get().exists:
+                                console.print(f"[bold red]A document with ID '{new_id}' already exists.[/bold red]")
+                                continue
+                            try:
+                                doc_ref.set(doc_ref.get().to_dict()) # Copy data
+                                console.print(Panel(f"Document [bold]{doc.id}[/bold] successfully copied to [bold green]{new_id}[/bold green] (including all subcollections).", title="[bold green]Rename Success[/bold green]", border_style="green"))
+                                delete_original = input("Delete the original document? (y/N): ").strip().lower()
+                                if delete_original == 'y':
+                                    doc_ref.delete()
+                                    console.print(Panel(f"Original document [bold]{doc.id}[/bold] deleted.", title="[bold red]Deleted[/bold red]", border_style="red"))
+                            except Exception as e:
+                                console.print(Panel(f"[bold red]Rename failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+                        else:
+                            console.print("[bold red]Invalid edit action key.[/bold red]")
+                else:
+                    console.print("[bold red]Invalid action key.[/bold red]")
+        elif user_input.isdigit() and menu_items:
+            idx = int(user_input) - 1
+            if 0 <= idx < len(menu_items):
+                name, value, typ, key = menu_items[idx]
+                if typ == "field" and (value == "[View]" or isinstance(data[key], (dict, list))):
+                    explore_data(data[key], f"{path}/{doc.id}/{key}")
+                elif typ == "subcoll":
+                    subcoll_ref = doc_ref.collection(key)
+                    browse_firestore_collection(subcoll_ref, f"{path}/{doc.id}/{key}", db, preview_fields)
+                else:
+                    console.print("[bold red]This item is not viewable.", style="red")
+            else:
+                console.print("[bold red]Invalid selection number.[/bold red]")
+        else:
+            console.print("[bold red]Invalid input. Enter a number to view, or press Enter for actions.")
+    return False
+
+def browse_firestore_collection(collection_ref, path="", db=None, preview_fields=None):
+    preview_fields = list(preview_fields or [])
+    # page_starts[i] is the last document of page i-1 (the start_after cursor for page i)
+    page_starts = [None]
+    page_index = 0
     while True:
         console.print(Panel(f"[bold yellow]You are here: [/] [bold green]{path or '/'}[/]", title="Current Firestore Path", border_style="cyan"))
-        docs = list(collection_ref.stream())
+        docs, has_next = fetch_document_page(collection_ref, preview_fields, page_starts[page_index])
+        if not docs and page_index > 0:
+            page_starts, page_index = [None], 0
+            continue
+        read_only = getattr(collection_ref, "read_only", False)
+        if not docs and read_only:
+            console.print("[bold red]No documents found at this level in the snapshot.[/bold red]")
+            return
         if not docs:
             # If no documents, check for user IDs from Firebase Auth and show matching documents
             try:
@@ -71,14 +283,35 @@ def browse_firestore_collection(collection_ref, path="", db=None):
                 console.print(f"[!] Error fetching user IDs: {e}")
                 return
         # Show documents in a rich table with numbers for selection
-        doc_table = Table(title=f"[bold blue]Documents in {path or '/'}[/bold blue]", show_header=True)
-        doc_table.add_column("#", style="bold magenta", width=4)
-        doc_table.add_column("Document ID", style="bold")
-        for idx, doc in enumerate(docs, 1):
-            doc_table.add_row(str(idx), doc.id)
-        console.print(doc_table)
+        page_label = f" (page {page_index + 1}{', more' if has_next else ''})" if has_next or page_index else ""
+        show_documents_table(docs, preview_fields, title=f"Documents in {path or '/'}{page_label}")
         while True:
-            user_input = input("Enter a document number to view, or press Enter for actions: ").strip()
+            user_input = input("Enter a document number to view, N/P for next/previous page, V to set preview columns, or press Enter for actions: ").strip()
+            if user_input.upper() == "N":
+                if not has_next:
+                    console.print("[bold yellow]Already on the last page.[/bold yellow]")
+                    continue
+                page_starts = page_starts[:page_index + 1] + [docs[-1]]
+                page_index += 1
+                break
+            if user_input.upper() == "P":
+                if page_index == 0:
+                    console.print("[bold yellow]Already on the first page.[/bold yellow]")
+                    continue
+                page_index -= 1
+                break
+            if user_input.upper() == "V":
+                fields_input = input(f"Preview fields, comma-separated (current: {', '.join(preview_fields) or 'none'}): ").strip()
+                try:
+                    # Quoted here so names like user-name are valid field paths for select()
+                    preview_fields = parse_preview_fields(fields_input)
+                except ValueError as e:
+                    console.print(f"[bold red]{e}[/bold red]")
+                    continue
+                break
+            if user_input == "" and read_only:
+                console.print("[bold yellow]Snapshot mode is read-only. Enter a document number or 0 to go back.[/bold yellow]")
+                continue
             if user_input == "":
                 # Show document list actions
                 doc_action_table = Table(title="[bold blue]Document List Actions[/bold blue]", show_header=False)
@@ -111,6 +344,7 @@ def browse_firestore_collection(collection_ref, path="", db=None):
                     if not del_doc_ref.get().exists:
                         console.print(f"[bold red]Document '{del_doc_id}' does not exist.[/bold red]")
                         continue
+                    preview_subtree(db, f"{path.strip('/')}/{del_doc_id}")
                     confirm = input(f"[bold red]Are you sure you want to delete document '{del_doc_id}'? (y/N): [/bold red]").strip().lower()
                     if confirm == 'y':
                         recursive_delete_by_path(db, f"{collection_ref.id}/{del_doc_id}")
@@ -154,138 +388,66 @@ def browse_firestore_collection(collection_ref, path="", db=None):
                 if doc_choice == 0:
                     return
                 if 1 <= doc_choice <= len(docs):
-                    doc = docs[doc_choice-1]
-                    doc_ref = collection_ref.document(doc.id)
-                    data = doc.to_dict()
-                    subcolls = list(doc_ref.collections())
-                    # Remove the Document Details panel
-                    # Only show the current path panel and the combined table
-                    while True:
-                        console.print(Panel(f"[bold yellow]You are here: [/] [bold green]{path}/{doc.id}[/]", title="Current Firestore Path", border_style="cyan"))
-                        # Build a combined list of fields (with [View]) and subcollections
-                        fields = list(data.items()) if data else []
-                        subcolls = list(doc_ref.collections())
-                        menu_items = []
-                        for idx, (k, v) in enumerate(fields, 1):
-                            if isinstance(v, (dict, list)):
-                                menu_items.append((f"{k}", "[View]", "field", k))
-                            else:
-                                menu_items.append((f"{k}", str(v), "field", k))
-                        for sidx, subcoll in enumerate(subcolls, len(fields) + 1):
-                            menu_items.append((subcoll.id, "(subcollection)", "subcoll", subcoll.id))
-                        # Display only the combined table
-                        table = Table(title="[bold green]Fields & Subcollections[/bold green]", show_header=True, header_style="bold green")
-                        table.add_column("#", style="dim", width=4)
-                        table.add_column("Name", style="bold yellow")
-                        table.add_column("Value", style="yellow")
-                        for idx, (name, value, typ, key) in enumerate(menu_items, 1):
-                            table.add_row(str(idx), name, value)
-                        if not menu_items:
-                            table.add_row("-", "(none)", "")
-                        console.print(table)
-                        # Prompt for navigation or actions
-                        user_input = input("Enter a number to view, or press Enter for actions: ").strip()
-                        if user_input == "":
-                            # Show action menu
-                            action_table = Table(title="[bold blue]Actions[/bold blue]", show_header=False)
-                            action_table.add_column("Key", style="bold magenta", width=4)
-                            action_table.add_column("Action", style="bold")
-                            action_table.add_row("E", "Edit (fields, subcollections, rename)")
-                            action_table.add_row("D", "Delete Document")
-                            action_table.add_row("Q", "Back")
-                            console.print(action_table)
-                            while True:
-                                action_choice = input("Select an action (E/D/Q): ").strip().upper()
-                                if action_choice == "Q":
-                                    # Just break out of the actions menu, not the document view
-                                    break
-                                elif action_choice == "D":
-                                    confirm = input(f"Are you sure you want to delete document '{doc.id}'? (y/N): ").strip().lower()
-                                    if confirm == 'y':
-                                        recursive_delete_by_path(db, f"{collection_ref.id}/{doc.id}")
-                                        console.print(Panel(f"Document [bold]{doc.id}[/bold] deleted (including all subcollections).", title="[bold red]Deleted[/bold red]", border_style="red"))
-                                        return
-                                elif action_choice == "E":
-                                    # Edit submenu (same as before)
-                                    while True:
-                                        edit_table = Table(title="[bold blue]Edit Document[/bold blue]", show_header=False)
-                                        edit_table.add_column("Key", style="bold magenta", width=4)
-                                        edit_table.add_column("Action", style="bold")
-                                        edit_table.add_row("A", "Add Field")
-                                        edit_table.add_row("F", "Edit Field")
-                                        edit_table.add_row("R", "Rename Document")
-                                        edit_table.add_row("B", "Back")
-                                        console.print(edit_table)
-                                        edit_choice = input("Select an edit action (A/F/R/B): ").strip().upper()
-                                        if edit_choice == "B":
-                                            break
-                                        elif edit_choice == "A":
-                                            field_name = input("Enter new field name: ").strip()
-                                            if not field_name:
-                                                console.print("[bold red]No field name entered.[/bold red]")
-                                                continue
-                                            field_value = input(f"Enter value for '{field_name}': ")
-                                            try:
-                                                doc_ref.update({field_name: json.loads(field_value)})
-                                            except Exception:
-                                                doc_ref.update({field_name: field_value})
-                                            console.print(Panel(f"Field [bold]{field_name}[/bold] added.", title="[bold green]Success[/bold green]", border_style="green"))
-                                        elif edit_choice == "F":
-                                            field_name = input("Enter field name to edit/delete: ").strip()
-                                            if not field_name or field_name not in data:
-                                                console.print("[bold red]Invalid or missing field name.[/bold red]")
-                                                continue
-                                            subedit = input("[E]dit or [D]elete this field? ").strip().upper()
-                                            if subedit == "E":
-                                                new_val = input(f"Enter new value for '{field_name}': ")
-                                                try:
-                                                    doc_ref.update({field_name: json.loads(new_val)})
-                                                except Exception:
-                                                    doc_ref.update({field_name: new_val})
-                                                console.print(Panel(f"Field [bold]{field_name}[/bold] updated.", title="[bold green]Success[/bold green]", border_style="green"))
-                                            elif subedit == "D":
-                                                doc_ref.update({field_name: firestore.DELETE_FIELD})
-                                                console.print(Panel(f"Field [bold]{field_name}[/bold] deleted.", title="[bold red]Deleted[/bold red]", border_style="red"))
-                                            else:
-                                                console.print("[bold red]Invalid choice.[/bold red]")
-                                        elif edit_choice == "R":
-                                            new_id = input("Enter new document ID: ").strip()
-                                            if not new_id:
-                                                console.print("[bold red]No ID entered. Rename cancelled.[/bold red]")
-                                                continue
-                                            new_doc_ref = collection_ref.document(new_id)
-                                            if new_doc_ref.get().exists:
-                                                console.print(f"[bold red]A document with ID '{new_id}' already exists.[/bold red]")
-                                                continue
-                                            try:
-                                                doc_ref.set(doc_ref.get().to_dict()) # Copy data
-                                                console.print(Panel(f"Document [bold]{doc.id}[/bold] successfully copied to [bold green]{new_id}[/bold green] (including all subcollections).", title="[bold green]Rename Success[/bold green]", border_style="green"))
-                                                delete_original = input("Delete the original document? (y/N): ").strip().lower()
-                                                if delete_original == 'y':
-                                                    doc_ref.delete()
-                                                    console.print(Panel(f"Original document [bold]{doc.id}[/bold] deleted.", title="[bold red]Deleted[/bold red]", border_style="red"))
-                                            except Exception as e:
-                                                console.print(Panel(f"[bold red]Rename failed:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
-                                        else:
-                                            console.print("[bold red]Invalid edit action key.[/bold red]")
-                                else:
-                                    console.print("[bold red]Invalid action key.[/bold red]")
-                        elif user_input.isdigit() and menu_items:
-                            idx = int(user_input) - 1
-                            if 0 <= idx < len(menu_items):
-                                name, value, typ, key = menu_items[idx]
-                                if typ == "field" and (value == "[View]" or isinstance(data[key], (dict, list))):
-                                    explore_data(data[key], f"{path}/{doc.id}/{key}")
-                                elif typ == "subcoll":
-                                    subcoll_ref = doc_ref.collection(key)
-                                    browse_firestore_collection(subcoll_ref, f"{path}/{doc.id}/{key}", db)
-                                else:
-                                    console.print("[bold red]This item is not viewable.", style="red")
-                            else:
-                                console.print("[bold red]Invalid selection number.[/bold red]")
-                        else:
-                            console.print("[bold red]Invalid input. Enter a number to view, or press Enter for actions.")
-                    # End of document actions menu loop
+                    if browse_document(collection_ref, docs[doc_choice-1].id, path, db, preview_fields):
+                        # Deleted together with its subcollections; nothing left to show here
+                        return
+                    # Back from the document view: redraw the current page
+                    break
                 else:
                     console.print("Invalid choice.")
-            # End of main document menu loop 
\ No newline at end of file
+            # End of main document menu loop 
+
+def browse_search_results(db, group_id, filters, preview_fields=None, page_size=SEARCH_PAGE_SIZE):
+    """Page through a collection-group search; opening a hit jumps straight into its document view."""
+    preview_fields = list(preview_fields or [])
+    # page_cursors[i] is the path of the last hit of page i-1 (the start_after cursor for page i)
+    page_cursors = [None]
+    page_index = 0
+    while True:
+        try:
+            docs, next_cursor = search_page(db, group_id, filters, page_size, page_cursors[page_index], preview_fields)
+        except FailedPrecondition as e:
+            # Collection-group filters need a composite index; the message carries the link to create it
+            console.print(Panel(f"[bold red]This search needs an index:[/bold red] {e}", title="[bold red]Error[/bold red]", border_style="red"))
+            return
+        except SearchCursorError:
+            # The hit this page starts after was deleted; its position in the results is gone
+            console.print("[bold yellow]The previous page changed; back to the first page.[/bold yellow]")
+            page_cursors, page_index = [None], 0
+            continue
+        if not docs:
+            console.print(f"[bold yellow]No documents in any '{group_id}' collection match.[/bold yellow]")
+            return
+        has_next = next_cursor is not None
+        page_label = f" (page {page_index + 1}{', more' if has_next else ''})" if has_next or page_index else ""
+        show_search_results_table(docs, preview_fields, title=f"'{group_id}' matches{page_label}")
+        while True:
+            user_input = input("Enter a result number to open, N/P for next/previous page, or 0 to go back: ").strip()
+            if user_input == "0" or user_input == "":
+                return
+            if user_input.upper() == "N":
+                if not has_next:
+                    console.print("[bold yellow]Already on the last page.[/bold yellow]")
+                    continue
+                page_cursors = page_cursors[:page_index + 1] + [next_cursor]
+                page_index += 1
+                break
+            if user_input.upper() == "P":
+                if page_index == 0:
+                    console.print("[bold yellow]Already on the first page.[/bold yellow]")
+                    continue
+                page_index -= 1
+                break
+            try:
+                choice = int(user_input)
+            except ValueError:
+                console.print("[bold red]Invalid input.[/bold red]")
+                continue
+            if not 1 <= choice <= len(docs):
+                console.print("[bold red]Invalid result number.[/bold red]")
+                continue
+            doc_ref = docs[choice - 1].reference
+            parent_path = doc_ref.parent.path
+            browse_document(db.collection(parent_path), doc_ref.id, f"/{parent_path}", db, preview_fields)
+            # Back from the document (or it was deleted): reload this page
+            break
@@ -1,5 +1,6 @@
 from rich.console import Console
 from rich.panel import Panel
+from firebase_cli_app.core.rate_control import retry_call, limited_call
 
 console = Console()
 
@@ -14,7 +15,7 @@ def recursive_delete_by_path(db, path, parent_path=None):
                 subcoll_ref = doc_ref.collection(subcoll.id)
                 for subdoc in subcoll_ref.stream():
                     recursive_delete_by_path(db, f"{subcoll.id}/{subdoc.id}", parent_path=full_path)
-            doc_ref.delete()
+            retry_call(doc_ref.delete)
         except Exception as e:
             console.print(Panel(f"[bold red]Error deleting document or subcollections at {full_path}: {e}[/bold red]", title="[bold red]Delete Error[/bold red]", border_style="red"))
     else:
@@ -39,7 +40,7 @@ def delete_collection(coll_ref, batch_size=20, parent_path=None):
                 for subcoll in doc.reference.collections():
                     for subdoc in subcoll.stream():
                         recursive_delete_by_path(coll_ref._client, f"{subcoll.id}/{subdoc.id}", parent_path=doc_path)
-                doc.reference.delete()
+                retry_call(doc.reference.delete)
                 console.print(f"[dim]Deleted document [bold]{doc_path}[/bold]")
             except Exception as e:
                 console.print(Panel(f"[bold red]Error deleting document {doc_path}: {e}[/bold red]", title="[bold red]Delete Error[/bold red]", border_style="red"))
@@ -48,4 +49,80 @@ def delete_collection(coll_ref, batch_size=20, parent_path=None):
         return deleted
     except Exception as e:
         console.print(Panel(f"[bold red]Error streaming collection: {e}[/bold red]", title="[bold red]Delete Error[/bold red]", border_style="red"))
-        return 0 
\ No newline at end of file
+        return 0
+
+# Firestore caps a single batched write at 500 operations
+MAX_BATCH_SIZE = 500
+
+def count_documents(query, limiter=None):
+    # Server-side aggregation: one read per 1000 index entries instead of a full stream
+    try:
+        result = limited_call(limiter, query.count().get)
+        return int(result[0][0].value)
+    except Exception:
+        return None
+
+def iter_document_pages(coll_ref, page_size=MAX_BATCH_SIZE, field_paths=None, limiter=None):
+    query = coll_ref.order_by("__name__").limit(page_size)
+    if field_paths is not None:
+        query = query.select(field_paths)
+    last = None
+    while True:
+        page_query = query.start_after(last) if last is not None else query
+        docs = limited_call(limiter, lambda: list(page_query.stream()))
+        if not docs:
+            return
+        yield docs
+        if len(docs) < page_size:
+            return
+        last = docs[-1]
+
+def commit_batch(batch, count, limiter=None):
+    # Batches of sets/deletes are idempotent, so throttled commits can safely be retried
+    if limiter is not None:
+        return limiter.call(batch.commit, cost=count)
+    return retry_call(batch.commit)
+
+def batch_delete_collection(coll_ref, job=None, batch_size=MAX_BATCH_SIZE, limiter=None):
+    client = coll_ref._client
+    deleted = 0
+    page_query = coll_ref.select([]).limit(batch_size)
+    while True:
+        # Always re-read the first page: deleted documents drop out of the result
+        docs = limited_call(limiter, lambda: list(page_query.stream()))
+        if not docs:
+            return deleted
+        batch = client.batch()
+        for doc in docs:
+            batch.delete(doc.reference)
+        commit_batch(batch, len(docs), limiter)
+        deleted += len(docs)
+        if job is not None:
+            job.advance(len(docs))
+
+def batch_copy_collection(src_coll_ref, dst_coll_ref, job=None, batch_size=MAX_BATCH_SIZE, limiter=None):
+    client = dst_coll_ref._client
+    copied = 0
+    for docs in iter_document_pages(src_coll_ref, page_size=batch_size, limiter=limiter):
+        batch = client.batch()
+        for doc in docs:
+            batch.set(dst_coll_ref.document(doc.id), doc.to_dict())
+        commit_batch(batch, len(docs), limiter)
+        copied += len(docs)
+        if job is not None:
+            job.advance(len(docs))
+    return copied
+
+def firestore_json_default(value):
+    # json.dumps(default=...) hook for Firestore types that JSON has no encoding for
+    import base64
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if hasattr(value, "path"):
+        # DocumentReference / CollectionReference
+        return value.path
+    return str(value)
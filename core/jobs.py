@@ -0,0 +1,213 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for long-running operations (bulk deletes, renames, ...)
+MAX_JOB_WORKERS = int(os.environ.get("FIREDASH_JOB_WORKERS", "4"))
+# Finished jobs are kept around this long so clients can still poll them
+JOB_TTL_SECONDS = 3600
+# How often a running job pushes its progress to the shared store (multi-worker mode)
+PUBLISH_INTERVAL_SECONDS = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind, owner=None, total=None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.owner = owner
+        self.status = QUEUED
+        self.phase = None
+        self.processed = 0
+        self.total = total
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._on_progress = None
+        self._last_published = 0.0
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def request_cancel(self):
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+
+    def set_phase(self, phase):
+        with self._lock:
+            self.phase = phase
+
+    def advance(self, count=1):
+        # Called by workers after each unit of work; doubles as the cancellation point
+        with self._lock:
+            self.processed += count
+        now = time.time()
+        if self._on_progress is not None and now - self._last_published >= PUBLISH_INTERVAL_SECONDS:
+            self._last_published = now
+            self._on_progress(self)
+        self.check_cancelled()
+
+    def to_dict(self):
+        with self._lock:
+            processed, total = self.processed, self.total
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.status == RUNNING and total is not None and rate > 0:
+            eta = max(total - processed, 0) / rate
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "processed": processed,
+            "total": total,
+            "rate_per_second": round(rate, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "cancel_requested": self.cancel_requested,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_JOB_WORKERS, store=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firedash-job")
+        # Optional SharedState: lets other worker processes read status and request cancellation
+        self._store = store
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, owner=None, total=None, on_finish=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs) on the pool and return the Job immediately.
+        on_finish() runs once the job is over, including jobs cancelled before they started.
+        """
+        self._prune()
+        job = Job(kind, owner=owner, total=total)
+        if self._store is not None:
+            job._on_progress = self._publish
+            self._publish(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            future = self._futures[job.id] = self._executor.submit(self._run, job, fn, args, kwargs)
+        if on_finish is not None:
+            future.add_done_callback(lambda _future: on_finish())
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_snapshot(self, job_id):
+        """Return (owner, status dict) for a job run by this or any other worker."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.owner, job.to_dict()
+        if self._store is not None:
+            return self._store.load_job(job_id)
+        return None
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is None:
+            # Owned by another worker: it picks the flag up on its next progress publish
+            if self._store is not None:
+                self._store.request_job_cancel(job_id)
+            return None
+        if job.status in FINISHED_STATES:
+            return job
+        job.request_cancel()
+        # Jobs that never started can be dropped from the queue straight away
+        if future is not None and future.cancel():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        self._publish(job)
+        return job
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status not in FINISHED_STATES:
+                job.request_cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _publish(self, job):
+        if self._store is None:
+            return
+        try:
+            if self._store.job_cancel_requested(job.id):
+                job.request_cancel()
+            self._store.save_job(job.id, job.owner, job.to_dict())
+        except Exception:
+            # Shared-state hiccups must never take a running job down
+            pass
+
+    def _run(self, job, fn, args, kwargs):
+        # Picks up cancellations requested through another worker while queued
+        self._publish(job)
+        if job.cancel_requested:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._publish(job)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._publish(job)
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = COMPLETED
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            self._publish(job)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in FINISHED_STATES and job.finished_at and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+                self._futures.pop(job_id, None)
+        if self._store is not None:
+            try:
+                self._store.prune_jobs(JOB_TTL_SECONDS)
+            except Exception:
+                pass
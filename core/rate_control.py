@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import threading
+from google.api_core import exceptions as gexc
+
+# Per service account defaults; Firestore's own ramp-up guidance starts at 500 ops/s.
+# Controllers live in process memory: with N API workers a tenant can reach N x TENANT_RATE.
+TENANT_RATE = float(os.environ.get("FIREDASH_TENANT_RATE", "500"))
+TENANT_BURST = float(os.environ.get("FIREDASH_TENANT_BURST", "1000"))
+INITIAL_CONCURRENCY = int(os.environ.get("FIREDASH_INITIAL_CONCURRENCY", "8"))
+MAX_CONCURRENCY = int(os.environ.get("FIREDASH_MAX_CONCURRENCY", "64"))
+MAX_RETRIES = int(os.environ.get("FIREDASH_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = 0.1
+BACKOFF_CAP_SECONDS = 10.0
+
+# Backend is overloaded or the tenant exceeded its quota: slow down
+THROTTLING_ERRORS = (gexc.ResourceExhausted, gexc.Aborted)
+# Worth retrying, but not a signal that we are sending too fast
+TRANSIENT_ERRORS = (gexc.ServiceUnavailable, gexc.DeadlineExceeded, gexc.InternalServerError)
+
+
+def is_throttling(exc):
+    return isinstance(exc, THROTTLING_ERRORS)
+
+
+def is_retryable(exc):
+    return isinstance(exc, THROTTLING_ERRORS + TRANSIENT_ERRORS)
+
+
+def backoff_delay(attempt):
+    # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+class TokenBucket:
+    def __init__(self, rate=TENANT_RATE, burst=TENANT_BURST):
+        self.rate = rate
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1.0):
+        # Requests larger than the bucket are let through once it is full
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait = (cost - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls: +1 per window of successes, halved on throttling errors."""
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=1, maximum=MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class RateController:
+    def __init__(self, rate=TENANT_RATE, burst=TENANT_BURST):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency()
+        self.last_used = time.monotonic()
+
+    def call(self, fn, *args, idempotent=True, cost=1, **kwargs):
+        """
+        Run fn under this controller's rate and concurrency limits. Throttling and transient
+        errors are retried with jittered exponential backoff when the operation is idempotent.
+        """
+        self.last_used = time.monotonic()
+        attempt = 0
+        while True:
+            self.bucket.acquire(cost)
+            self.concurrency.acquire()
+            throttled = False
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttling(e)
+                if not (idempotent and is_retryable(e)) or attempt >= MAX_RETRIES:
+                    raise
+            finally:
+                self.concurrency.release(throttled=throttled)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def controller_for(key):
+    """Shared controller per service account (or any other tenant key)."""
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            controller = _controllers[key] = RateController()
+        return controller
+
+
+def forget_controller(key):
+    with _controllers_lock:
+        _controllers.pop(key, None)
+
+
+def prune_controllers(max_idle_seconds):
+    """Drop controllers unused for max_idle_seconds, e.g. of tenants that expired on another worker."""
+    cutoff = time.monotonic() - max_idle_seconds
+    with _controllers_lock:
+        for key, controller in list(_controllers.items()):
+            if controller.last_used < cutoff and controller.concurrency.in_flight == 0:
+                del _controllers[key]
+
+
+def retry_call(fn, *args, idempotent=True, **kwargs):
+    """Retry with backoff only, for callers that are not tied to a tenant (e.g. the CLI)."""
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not (idempotent and is_retryable(e)) or attempt >= MAX_RETRIES:
+                raise
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
+def limited_call(limiter, fn, *args, **kwargs):
+    """Through the tenant's controller when one is given (the API), plain retries otherwise (the CLI)."""
+    if limiter is not None:
+        return limiter.call(fn, *args, **kwargs)
+    return retry_call(fn, *args, **kwargs)
@@ -0,0 +1,80 @@
+import re
+from firebase_cli_app.core.edit_buffer import parse_field_value
+from firebase_cli_app.core.ui_helpers import split_field_path, quote_field_path
+from firebase_cli_app.core.rate_control import limited_call
+
+SEARCH_PAGE_SIZE = 50
+# Longest operators first so ">=" is not read as ">"
+SYMBOL_OPERATORS = ("==", "!=", "<=", ">=", "<", ">")
+WORD_OPERATORS = ("array-contains-any", "array-contains", "not-in", "in")
+OPERATORS = WORD_OPERATORS + SYMBOL_OPERATORS
+# Firestore's own spelling is hyphenated, the Python SDK's where() wants underscores
+_SDK_OPERATORS = {"array-contains": "array_contains", "array-contains-any": "array_contains_any"}
+# Word operators must stand alone, or "pinned == true" would split at the "in" of "pinned"
+_FILTER_RE = re.compile(
+    r"^\s*(?P<field>\S.*?)"
+    r"(?:\s*(?P<symbol>" + "|".join(re.escape(op) for op in SYMBOL_OPERATORS) + r")\s*"
+    r"|\s+(?P<word>" + "|".join(re.escape(op) for op in WORD_OPERATORS) + r")\s+)"
+    r"(?P<value>.*?)\s*$"
+)
+
+
+class SearchFilterError(ValueError):
+    pass
+
+
+class SearchCursorError(ValueError):
+    pass
+
+
+def parse_filter(expression):
+    """'status == "open"' -> ("status", "==", "open"). Values are JSON when they parse, strings otherwise."""
+    match = _FILTER_RE.match(expression)
+    if not match or not match.group("value"):
+        raise SearchFilterError(f"Invalid filter '{expression}'. Use: <field> <op> <value>, op one of {', '.join(OPERATORS)}")
+    field, op = match.group("field"), match.group("symbol") or match.group("word")
+    try:
+        # Quoted like preview fields, so names such as user-name are valid field paths
+        field = quote_field_path(split_field_path(field))
+    except ValueError as e:
+        raise SearchFilterError(str(e))
+    value = parse_field_value(match.group("value"))
+    if op in ("in", "not-in", "array-contains-any") and not isinstance(value, list):
+        raise SearchFilterError(f"'{op}' needs a JSON list value, e.g. {field} {op} [\"a\", \"b\"]")
+    return field, op, value
+
+
+def build_search_query(db, group_id, filters, page_size=SEARCH_PAGE_SIZE, cursor=None, field_paths=None, limiter=None):
+    """
+    Collection-group query over every collection named group_id, at any depth.
+    cursor is the full path of the last document of the previous page.
+    """
+    query = db.collection_group(group_id)
+    for field, op, value in filters:
+        query = query.where(field, _SDK_OPERATORS.get(op, op), value)
+    if field_paths is not None:
+        query = query.select(field_paths)
+    query = query.limit(page_size)
+    if cursor:
+        query = query.start_after(_cursor_snapshot(db, group_id, cursor, limiter))
+    return query
+
+
+def _cursor_snapshot(db, group_id, cursor, limiter=None):
+    # A snapshot cursor lets the SDK fill in the implicit orderings of inequality filters
+    segments = cursor.strip("/").split("/")
+    if len(segments) % 2 or len(segments) < 2 or segments[-2] != group_id:
+        raise SearchCursorError(f"Cursor '{cursor}' is not a document in a '{group_id}' collection.")
+    snapshot = limited_call(limiter, db.document(*segments).get)
+    if not snapshot.exists:
+        raise SearchCursorError(f"Cursor document '{cursor}' no longer exists; restart the search.")
+    return snapshot
+
+
+def search_page(db, group_id, filters, page_size=SEARCH_PAGE_SIZE, cursor=None, field_paths=None, limiter=None):
+    """One page of hits plus the cursor for the next page (None on the last page)."""
+    query = build_search_query(db, group_id, filters, page_size, cursor, field_paths, limiter)
+    docs = limited_call(limiter, lambda: list(query.stream()))
+    next_cursor = docs[-1].reference.path if len(docs) == page_size else None
+    return docs, next_cursor
+
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+
+# SQLite-backed state shared by every API worker process on a node.
+# WAL mode lets readers and the single writer proceed without blocking each other.
+
+
+def worker_identity():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SharedState:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tenants ("
+                " service_account_id TEXT PRIMARY KEY,"
+                " file_path TEXT NOT NULL,"
+                " uploaded_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " owner TEXT,"
+                " snapshot TEXT NOT NULL,"
+                " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # Tenants
+
+    def register_tenant(self, service_account_id, file_path, uploaded_at=None):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO tenants (service_account_id, file_path, uploaded_at) VALUES (?, ?, ?)",
+            (service_account_id, file_path, uploaded_at or time.time()),
+        )
+
+    def get_tenant_file(self, service_account_id):
+        row = self._connect().execute(
+            "SELECT file_path FROM tenants WHERE service_account_id = ?", (service_account_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def expired_tenants(self, max_age):
+        cutoff = time.time() - max_age
+        return self._connect().execute(
+            "SELECT service_account_id, file_path FROM tenants WHERE uploaded_at < ?", (cutoff,)
+        ).fetchall()
+
+    def remove_tenant(self, service_account_id):
+        self._connect().execute("DELETE FROM tenants WHERE service_account_id = ?", (service_account_id,))
+
+    # Leases (leader election for node-wide singletons such as the sweeper)
+
+    def try_acquire_lease(self, name, owner, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is None or row[0] == owner or row[1] < now:
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                    (name, owner, now + ttl),
+                )
+                acquired = True
+            else:
+                acquired = False
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def release_lease(self, name, owner):
+        self._connect().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    # Jobs (snapshots so any worker can answer status and cancellation requests)
+
+    def save_job(self, job_id, owner, snapshot):
+        self._connect().execute(
+            "INSERT INTO jobs (job_id, owner, snapshot, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(job_id) DO UPDATE SET snapshot = excluded.snapshot, updated_at = excluded.updated_at",
+            (job_id, owner, json.dumps(snapshot), time.time()),
+        )
+
+    def load_job(self, job_id):
+        row = self._connect().execute(
+            "SELECT owner, snapshot, cancel_requested FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        owner, snapshot, cancel_requested = row
+        snapshot = json.loads(snapshot)
+        snapshot["cancel_requested"] = snapshot.get("cancel_requested") or bool(cancel_requested)
+        return owner, snapshot
+
+    def request_job_cancel(self, job_id):
+        self._connect().execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+
+    def job_cancel_requested(self, job_id):
+        row = self._connect().execute(
+            "SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def prune_jobs(self, max_age):
+        self._connect().execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - max_age,))
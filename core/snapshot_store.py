@@ -0,0 +1,323 @@
+import json
+import sqlite3
+from rich.console import Console
+from firebase_cli_app.core.firestore_utils import iter_document_pages, firestore_json_default
+from firebase_cli_app.core.ui_helpers import split_field_path
+
+console = Console()
+
+# Offline copy of a Firestore tree in a single SQLite file. The classes below mimic the
+# subset of the Firestore client API used by the browser, so it can run against either.
+
+
+class SnapshotReadOnlyError(Exception):
+    pass
+
+
+def _timestamp_key(ts):
+    if ts is None:
+        return None
+    return ts.rfc3339() if hasattr(ts, "rfc3339") else ts.isoformat()
+
+
+def _split_path(path):
+    return [p for p in path.strip("/").split("/") if p]
+
+
+class SnapshotStore:
+    read_only = True
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " path TEXT PRIMARY KEY,"
+            " parent TEXT NOT NULL,"
+            " doc_id TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " update_time TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS documents_parent ON documents (parent, doc_id)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            " path TEXT PRIMARY KEY,"
+            " parent_doc TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS collections_parent ON collections (parent_doc)")
+        self.conn.commit()
+
+    # Firestore-client-like entry points
+
+    def collection(self, path):
+        return SnapshotCollection(self, path.strip("/"))
+
+    def document(self, path):
+        return SnapshotDocumentRef(self, path.strip("/"))
+
+    def collections(self):
+        return self._child_collections("")
+
+    # Storage
+
+    def _child_collections(self, parent_doc):
+        rows = self.conn.execute(
+            "SELECT path FROM collections WHERE parent_doc = ? ORDER BY path", (parent_doc,)
+        ).fetchall()
+        return [SnapshotCollection(self, row[0]) for row in rows]
+
+    def _documents(self, parent, after_id=None, limit=None):
+        sql = "SELECT doc_id, data, update_time FROM documents WHERE parent = ?"
+        params = [parent]
+        if after_id is not None:
+            sql += " AND doc_id > ?"
+            params.append(after_id)
+        sql += " ORDER BY doc_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def _document(self, path):
+        return self.conn.execute(
+            "SELECT data, update_time FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+
+    def update_times(self, parent):
+        rows = self.conn.execute(
+            "SELECT doc_id, update_time FROM documents WHERE parent = ?", (parent,)
+        ).fetchall()
+        return dict(rows)
+
+    def put_collection(self, path):
+        parts = _split_path(path)
+        parent_doc = "/".join(parts[:-1])
+        self.conn.execute(
+            "INSERT OR IGNORE INTO collections (path, parent_doc) VALUES (?, ?)", (path, parent_doc)
+        )
+
+    def put_document(self, doc):
+        path = doc.reference.path
+        parent = "/".join(_split_path(path)[:-1])
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (path, parent, doc_id, data, update_time) VALUES (?, ?, ?, ?, ?)",
+            (path, parent, doc.id, json.dumps(doc.to_dict() or {}, default=firestore_json_default),
+             _timestamp_key(doc.update_time)),
+        )
+
+    def delete_subtree(self, path):
+        # Prefix compare instead of LIKE: "_" and "%" are ordinary characters in document IDs
+        prefix = f"{path}/"
+        for table in ("documents", "collections"):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE path = ? OR substr(path, 1, ?) = ?", (path, len(prefix), prefix)
+            )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class SnapshotCollection:
+    def __init__(self, store, path):
+        self._store = store
+        self.path = path
+        self.id = _split_path(path)[-1]
+        self.read_only = True
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            raise SnapshotReadOnlyError("Snapshot mode is read-only.")
+        return SnapshotDocumentRef(self._store, f"{self.path}/{doc_id}")
+
+    def stream(self):
+        return SnapshotQuery(self).stream()
+
+    # Query builders, enough for paged and projected listings ordered by document ID
+
+    def order_by(self, field_path, direction=None):
+        return SnapshotQuery(self).order_by(field_path, direction)
+
+    def select(self, field_paths):
+        return SnapshotQuery(self).select(field_paths)
+
+    def limit(self, count):
+        return SnapshotQuery(self).limit(count)
+
+
+class SnapshotQuery:
+    def __init__(self, collection, field_paths=None, limit=None, after_id=None):
+        self._collection = collection
+        self._field_paths = field_paths
+        self._limit = limit
+        self._after_id = after_id
+
+    def _copy(self, **changes):
+        values = {"field_paths": self._field_paths, "limit": self._limit, "after_id": self._after_id}
+        values.update(changes)
+        return SnapshotQuery(self._collection, **values)
+
+    def order_by(self, field_path, direction=None):
+        if field_path != "__name__":
+            raise SnapshotReadOnlyError("Snapshot queries can only be ordered by document ID.")
+        return self
+
+    def select(self, field_paths):
+        return self._copy(field_paths=list(field_paths))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, document):
+        return self._copy(after_id=document.id)
+
+    def stream(self):
+        store, path = self._collection._store, self._collection.path
+        for doc_id, data, update_time in store._documents(path, after_id=self._after_id, limit=self._limit):
+            if self._field_paths is not None:
+                data = json.dumps(_project(json.loads(data), self._field_paths))
+            yield SnapshotDocument(SnapshotDocumentRef(store, f"{path}/{doc_id}"), data, update_time)
+
+
+def _project(data, field_paths):
+    projected = {}
+    for field_path in field_paths:
+        parts = split_field_path(field_path)
+        value = data
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+
+class SnapshotDocumentRef:
+    def __init__(self, store, path):
+        self._store = store
+        self.path = path
+        self.id = _split_path(path)[-1]
+
+    def get(self):
+        row = self._store._document(self.path)
+        if row is None:
+            return SnapshotDocument(self, None, None)
+        return SnapshotDocument(self, row[0], row[1])
+
+    def collections(self):
+        return self._store._child_collections(self.path)
+
+    def collection(self, collection_id):
+        return SnapshotCollection(self._store, f"{self.path}/{collection_id}")
+
+    def _read_only(self, *args, **kwargs):
+        raise SnapshotReadOnlyError("Snapshot mode is read-only.")
+
+    set = update = delete = _read_only
+
+
+class SnapshotDocument:
+    def __init__(self, reference, data, update_time):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = update_time
+        self._data = data
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        return json.loads(self._data)
+
+    def get(self, field_path):
+        value = self.to_dict() or {}
+        for part in split_field_path(field_path):
+            if not isinstance(value, dict) or part not in value:
+                raise KeyError(field_path)
+            value = value[part]
+        return value
+
+
+def _pull_ancestors(db, store, collection_path):
+    # A subtree pull (e.g. users/abc/chats) still needs its parents to be navigable offline
+    parts = _split_path(collection_path)
+    for depth in range(1, len(parts), 2):
+        store.put_collection("/".join(parts[:depth]))
+        doc_path = "/".join(parts[:depth + 1])
+        if store._document(doc_path) is None:
+            snapshot = db.document(doc_path).get()
+            if snapshot.exists:
+                store.put_document(snapshot)
+            else:
+                parent = "/".join(parts[:depth])
+                store.conn.execute(
+                    "INSERT OR IGNORE INTO documents (path, parent, doc_id, data, update_time) VALUES (?, ?, ?, ?, NULL)",
+                    (doc_path, parent, parts[depth], "{}"),
+                )
+    store.commit()
+
+
+def pull_collection(db, store, collection_path, recursive=True):
+    """Copy a collection (and by default its whole subtree) into the store. Returns documents stored."""
+    _pull_ancestors(db, store, collection_path)
+    return _pull_tree(db, store, collection_path, recursive)
+
+
+def _pull_tree(db, store, collection_path, recursive):
+    collection_path = collection_path.strip("/")
+    coll_ref = db.collection(collection_path)
+    store.put_collection(collection_path)
+    stored = 0
+    for docs in iter_document_pages(coll_ref):
+        for doc in docs:
+            store.put_document(doc)
+        store.commit()
+        stored += len(docs)
+        console.print(f"[dim]Pulled {stored} documents from [bold]{collection_path}[/bold]")
+        if recursive:
+            for doc in docs:
+                for subcoll in doc.reference.collections():
+                    stored += _pull_tree(db, store, f"{doc.reference.path}/{subcoll.id}", recursive)
+    return stored
+
+
+def refresh_collection(db, store, collection_path, recursive=True):
+    """Delta refresh: list update times with an empty projection and only fetch changed documents."""
+    collection_path = collection_path.strip("/")
+    _pull_ancestors(db, store, collection_path)
+    coll_ref = db.collection(collection_path)
+    store.put_collection(collection_path)
+    known = store.update_times(collection_path)
+    seen = set()
+    fetched = 0
+    for docs in iter_document_pages(coll_ref, field_paths=[]):
+        changed = []
+        for doc in docs:
+            seen.add(doc.id)
+            if known.get(doc.id) != _timestamp_key(doc.update_time):
+                changed.append(doc.reference)
+        if changed:
+            for full_doc in db.get_all(changed):
+                if full_doc.exists:
+                    store.put_document(full_doc)
+            fetched += len(changed)
+        store.commit()
+        if recursive:
+            for doc in docs:
+                for subcoll in doc.reference.collections():
+                    fetched += refresh_collection(db, store, f"{doc.reference.path}/{subcoll.id}", recursive=True)
+    # Documents deleted upstream since the last pull. Placeholders (no update time) stand in for
+    # missing parents of a subtree pull; Firestore never lists those, so they are not deletions.
+    for doc_id in set(known) - seen:
+        if known[doc_id] is None:
+            continue
+        store.delete_subtree(f"{collection_path}/{doc_id}")
+    store.commit()
+    console.print(f"[dim]Refreshed [bold]{collection_path}[/bold]: {fetched} changed documents fetched")
+    return fetched
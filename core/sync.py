@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from firebase_cli_app.core.firestore_utils import iter_document_pages, firestore_json_default, commit_batch, MAX_BATCH_SIZE
+from firebase_cli_app.core.rate_control import limited_call
+
+# Relative to the working directory: the package itself may be installed read-only
+SYNC_STATE_PATH = os.environ.get("FIREDASH_SYNC_STATE_DB", "firedash_sync.db")
+SYNC_WORKERS = int(os.environ.get("FIREDASH_SYNC_WORKERS", "4"))
+# get_all() round trip size when fetching changed documents
+FETCH_CHUNK_SIZE = 300
+# since_field is stamped by application clocks, not by Firestore; re-read a margin behind the mark
+SINCE_FIELD_SKEW = datetime.timedelta(minutes=5)
+
+
+def content_hash(data):
+    encoded = json.dumps(data or {}, sort_keys=True, separators=(",", ":"), default=firestore_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _timestamp_key(ts):
+    if ts is None:
+        return None
+    return ts.rfc3339() if hasattr(ts, "rfc3339") else ts.isoformat()
+
+
+class SyncState:
+    """What was last written for each document of a source/target pair, plus the high-water mark."""
+
+    def __init__(self, db_path=SYNC_STATE_PATH):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_docs ("
+            " pair TEXT NOT NULL,"
+            " doc_id TEXT NOT NULL,"
+            " update_time TEXT,"
+            " hash TEXT NOT NULL,"
+            " PRIMARY KEY (pair, doc_id))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_marks ("
+            " pair TEXT PRIMARY KEY,"
+            " high_water TEXT,"
+            " last_run REAL)"
+        )
+        self.conn.commit()
+
+    def documents(self, pair):
+        rows = self.conn.execute(
+            "SELECT doc_id, update_time, hash FROM sync_docs WHERE pair = ?", (pair,)
+        ).fetchall()
+        return {doc_id: (update_time, doc_hash) for doc_id, update_time, doc_hash in rows}
+
+    def record(self, pair, entries):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sync_docs (pair, doc_id, update_time, hash) VALUES (?, ?, ?, ?)",
+            [(pair, doc_id, update_time, doc_hash) for doc_id, update_time, doc_hash in entries],
+        )
+        self.conn.commit()
+
+    def forget(self, pair, doc_ids):
+        self.conn.executemany("DELETE FROM sync_docs WHERE pair = ? AND doc_id = ?", [(pair, d) for d in doc_ids])
+        self.conn.commit()
+
+    def high_water(self, pair):
+        row = self.conn.execute("SELECT high_water FROM sync_marks WHERE pair = ?", (pair,)).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, pair, high_water):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_marks (pair, high_water, last_run) VALUES (?, ?, ?)",
+            (pair, high_water, time.time()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def sync_pair_key(src_db, src_path, dst_db, dst_path):
+    return f"{getattr(src_db, 'project', '?')}/{src_path}->{getattr(dst_db, 'project', '?')}/{dst_path}"
+
+
+def _parse_high_water(high_water):
+    if not high_water:
+        return None
+    return datetime.datetime.fromisoformat(high_water.replace("Z", "+00:00"))
+
+
+def _list_candidates(src_coll_ref, since_field, high_water, listing_all, limiter=None):
+    if since_field and high_water and not listing_all:
+        # Only documents the application stamped after the last run; requires an index on since_field
+        since = _parse_high_water(high_water) - SINCE_FIELD_SKEW
+        query = src_coll_ref.where(since_field, ">=", since)
+        return (limited_call(limiter, lambda: list(query.select([]).stream())),)
+    return iter_document_pages(src_coll_ref, field_paths=[], limiter=limiter)
+
+
+def sync_collection(src_db, dst_db, src_path, dst_path=None, delete_missing=False, since_field=None,
+                    state_path=SYNC_STATE_PATH, max_workers=SYNC_WORKERS, batch_size=MAX_BATCH_SIZE, job=None,
+                    limiter=None, source_limiter=None):
+    """
+    Incrementally copy one collection between two Firestore clients.
+
+    Documents whose update time matches the last sync are skipped without reading their
+    content; changed candidates are fetched and only written when their content hash differs.
+    With since_field (an application-maintained timestamp field), later runs list only
+    documents stamped after the high-water mark instead of the whole collection.
+    limiter throttles writes to the target, source_limiter the reads from the source.
+    """
+    src_path = src_path.strip("/")
+    dst_path = (dst_path or src_path).strip("/")
+    src_coll_ref = src_db.collection(src_path)
+    dst_coll_ref = dst_db.collection(dst_path)
+    state = SyncState(state_path)
+    pair = sync_pair_key(src_db, src_path, dst_db, dst_path)
+    known = state.documents(pair)
+    high_water = state.high_water(pair)
+    latest_update = None
+    seen = set()
+    stats = {"listed": 0, "fetched": 0, "written": 0, "unchanged": 0, "deleted": 0}
+
+    def write_operations(operations):
+        batch = dst_db.batch()
+        for op, doc_id, data in operations:
+            if op == "set":
+                batch.set(dst_coll_ref.document(doc_id), data)
+            else:
+                batch.delete(dst_coll_ref.document(doc_id))
+        commit_batch(batch, len(operations), limiter)
+        return len(operations)
+
+    # Deletes can only be detected from a full listing
+    listing_all = delete_missing or not known
+    # Batches queued or being written; beyond this the listing waits for the oldest to land
+    max_pending = max_workers * 2
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firedash-sync") as executor:
+            futures = deque()
+            writes = []
+            pending_state = []
+
+            def settle(future, entries, deleted_ids):
+                # Record each batch as soon as it is written, so an interrupted run keeps its progress
+                written = future.result()
+                if entries:
+                    state.record(pair, entries)
+                if deleted_ids:
+                    state.forget(pair, deleted_ids)
+                    stats["deleted"] += len(deleted_ids)
+                stats["written"] += written - len(deleted_ids)
+
+            def flush():
+                if writes:
+                    deleted_ids = [doc_id for op, doc_id, _ in writes if op == "delete"]
+                    futures.append((executor.submit(write_operations, list(writes)), list(pending_state), deleted_ids))
+                    writes.clear()
+                    pending_state.clear()
+                while futures and futures[0][0].done():
+                    settle(*futures.popleft())
+                while len(futures) >= max_pending:
+                    settle(*futures.popleft())
+
+            for docs in _list_candidates(src_coll_ref, since_field, high_water, listing_all, source_limiter):
+                stats["listed"] += len(docs)
+                changed = []
+                for doc in docs:
+                    seen.add(doc.id)
+                    update_time = _timestamp_key(doc.update_time)
+                    if doc.update_time and (latest_update is None or doc.update_time > latest_update):
+                        latest_update = doc.update_time
+                    if doc.id in known and known[doc.id][0] == update_time:
+                        stats["unchanged"] += 1
+                    else:
+                        changed.append(doc.reference)
+                for start in range(0, len(changed), FETCH_CHUNK_SIZE):
+                    unchanged_entries = []
+                    chunk = changed[start:start + FETCH_CHUNK_SIZE]
+                    for full_doc in limited_call(source_limiter, lambda: list(src_db.get_all(chunk))):
+                        if not full_doc.exists:
+                            continue
+                        stats["fetched"] += 1
+                        data = full_doc.to_dict()
+                        doc_hash = content_hash(data)
+                        entry = (full_doc.id, _timestamp_key(full_doc.update_time), doc_hash)
+                        if full_doc.id in known and known[full_doc.id][1] == doc_hash:
+                            # Touched but identical content: remember the new update time only
+                            unchanged_entries.append(entry)
+                            stats["unchanged"] += 1
+                            continue
+                        writes.append(("set", full_doc.id, data))
+                        pending_state.append(entry)
+                        if len(writes) >= batch_size:
+                            flush()
+                    if unchanged_entries:
+                        state.record(pair, unchanged_entries)
+                if job is not None:
+                    job.advance(len(docs))
+            flush()
+
+            if delete_missing:
+                for doc_id in set(known) - seen:
+                    writes.append(("delete", doc_id, None))
+                    if len(writes) >= batch_size:
+                        flush()
+                flush()
+
+            while futures:
+                settle(*futures.popleft())
+        previous = _parse_high_water(high_water)
+        if latest_update is not None and (previous is None or latest_update > previous):
+            high_water = latest_update.isoformat()
+            state.set_high_water(pair, high_water)
+    finally:
+        state.close()
+    return {"source": src_path, "target": dst_path, "high_water": high_water, **stats}
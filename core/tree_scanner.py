@@ -0,0 +1,224 @@
+import os
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from firebase_cli_app.core.firestore_utils import iter_document_pages, MAX_BATCH_SIZE
+from firebase_cli_app.core.rate_control import limited_call
+
+SCAN_WORKERS = int(os.environ.get("FIREDASH_SCAN_WORKERS", "16"))
+SCAN_PAGE_SIZE = MAX_BATCH_SIZE
+# Documents waiting for their subcollection listing before more pages are read
+SCAN_BACKLOG = int(os.environ.get("FIREDASH_SCAN_BACKLOG", "5000"))
+
+# Approximate storage sizes, following Firestore's documented size calculation:
+# https://firebase.google.com/docs/firestore/storage-size
+DOCUMENT_OVERHEAD_BYTES = 32
+DOCUMENT_NAME_OVERHEAD_BYTES = 16
+
+
+def _string_size(value):
+    return len(value.encode("utf-8")) + 1
+
+
+def document_name_size(path):
+    return sum(_string_size(segment) for segment in path.strip("/").split("/")) + DOCUMENT_NAME_OVERHEAD_BYTES
+
+
+def value_size(value):
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime.datetime)):
+        return 8
+    if isinstance(value, str):
+        return _string_size(value)
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_string_size(str(k)) + value_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(v) for v in value)
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return 16
+    if hasattr(value, "path"):
+        return document_name_size(value.path)
+    return _string_size(str(value))
+
+
+def estimate_document_size(path, data):
+    return document_name_size(path) + value_size(data or {}) + DOCUMENT_OVERHEAD_BYTES
+
+
+class TreeScan:
+    """Per-collection document counts and approximate byte sizes, direct and for the whole subtree."""
+
+    def __init__(self):
+        self.collections = {}
+        self._lock = threading.Lock()
+
+    def add(self, collection_path, documents, size):
+        with self._lock:
+            stats = self.collections.setdefault(collection_path, {"documents": 0, "bytes": 0})
+            stats["documents"] += documents
+            stats["bytes"] += size
+
+    def subtree(self, collection_path):
+        return self._subtree_totals().get(collection_path, {"documents": 0, "bytes": 0})
+
+    def _subtree_totals(self):
+        # One pass: each collection's stats are rolled up into its ancestor collections
+        # (every other path prefix), so this stays linear in the number of collections
+        with self._lock:
+            collections = {path: dict(stats) for path, stats in self.collections.items()}
+        totals = {path: dict(stats) for path, stats in collections.items()}
+        for path, stats in collections.items():
+            segments = path.split("/")
+            for depth in range(1, len(segments) - 1, 2):
+                ancestor = totals.get("/".join(segments[:depth]))
+                if ancestor is not None:
+                    ancestor["documents"] += stats["documents"]
+                    ancestor["bytes"] += stats["bytes"]
+        return totals
+
+    @property
+    def total_documents(self):
+        return sum(stats["documents"] for stats in self.collections.values())
+
+    @property
+    def total_bytes(self):
+        return sum(stats["bytes"] for stats in self.collections.values())
+
+    def rows(self, limit=None):
+        """Collections sorted by subtree size, largest first."""
+        totals = self._subtree_totals()
+        rows = [
+            {"path": path, **self.collections[path], **{f"subtree_{k}": v for k, v in subtree.items()}}
+            for path, subtree in totals.items()
+        ]
+        rows.sort(key=lambda row: row["subtree_bytes"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def to_dict(self, limit=None):
+        return {
+            "total_documents": self.total_documents,
+            "total_bytes": self.total_bytes,
+            "collections": self.rows(limit),
+        }
+
+
+def _scan_page(db, scan, collection_path, start_after, count_only, limiter=None):
+    # One page of a collection: returns its document references (for subcollection listings)
+    # and the cursor for the next page, or None after the last one
+    query = db.collection(collection_path).order_by("__name__").limit(SCAN_PAGE_SIZE)
+    if count_only:
+        query = query.select([])
+    if start_after is not None:
+        query = query.start_after(start_after)
+    docs = limited_call(limiter, lambda: list(query.stream()))
+    size = 0
+    for doc in docs:
+        path = doc.reference.path
+        size += document_name_size(path) + DOCUMENT_OVERHEAD_BYTES if count_only else estimate_document_size(path, doc.to_dict())
+    scan.add(collection_path, len(docs), size)
+    next_cursor = docs[-1] if len(docs) == SCAN_PAGE_SIZE else None
+    return len(docs), [doc.reference for doc in docs], next_cursor
+
+
+def _list_subcollections(doc_ref, limiter=None):
+    return limited_call(limiter, lambda: [f"{doc_ref.path}/{subcoll.id}" for subcoll in doc_ref.collections()])
+
+
+def scan_tree(db, path=None, max_workers=SCAN_WORKERS, count_only=False, job=None, limiter=None):
+    """
+    Walk a Firestore tree concurrently on a bounded pool.
+    path may be None (whole database), a collection path or a document path.
+
+    Collections are read one page per task, and the next page is only fetched while fewer
+    than SCAN_BACKLOG documents wait for their subcollection listing, so memory does not
+    grow with the size of the tree.
+    """
+    scan = TreeScan()
+    path = (path or "").strip("/")
+    # (collection path, start_after cursor) still to read, and documents still to list
+    pages = deque()
+    listings = deque()
+    if not path:
+        pages.extend((coll_id, None) for coll_id in limited_call(limiter, lambda: [coll.id for coll in db.collections()]))
+    elif len(path.split("/")) % 2 == 1:
+        pages.append((path, None))
+    else:
+        doc_ref = db.document(path)
+        snapshot = limited_call(limiter, doc_ref.get)
+        if snapshot.exists:
+            parent = "/".join(path.split("/")[:-1])
+            scan.add(parent, 1, estimate_document_size(path, snapshot.to_dict()))
+        listings.append(doc_ref)
+
+    def read_page(collection_path, start_after):
+        if job is not None:
+            job.check_cancelled()
+        scanned, refs, next_cursor = _scan_page(db, scan, collection_path, start_after, count_only, limiter)
+        if job is not None:
+            # Per page, so progress and cancellation work inside very large collections
+            job.advance(scanned)
+        return refs, (collection_path, next_cursor) if next_cursor is not None else None
+
+    def list_document(doc_ref):
+        if job is not None:
+            job.check_cancelled()
+        return _list_subcollections(doc_ref, limiter)
+
+    max_in_flight = max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firedash-scan") as executor:
+        pending = {}
+        pages_in_flight = 0
+        try:
+            while pages or listings or pending:
+                while len(pending) < max_in_flight:
+                    if listings:
+                        pending[executor.submit(list_document, listings.popleft())] = "document"
+                    elif pages and len(listings) + pages_in_flight * SCAN_PAGE_SIZE < SCAN_BACKLOG:
+                        pending[executor.submit(read_page, *pages.popleft())] = "page"
+                        pages_in_flight += 1
+                    else:
+                        break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind = pending.pop(future)
+                    if kind == "page":
+                        pages_in_flight -= 1
+                        refs, next_page = future.result()
+                        listings.extend(refs)
+                        if next_page is not None:
+                            pages.append(next_page)
+                    else:
+                        pages.extend((subcoll_path, None) for subcoll_path in future.result())
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return scan
+
+
+def scan_collection_group(db, group_id, count_only=False, job=None, limiter=None):
+    """Sizes of every collection named group_id, wherever it is nested, via one collection-group query."""
+    scan = TreeScan()
+    query = db.collection_group(group_id)
+    field_paths = [] if count_only else None
+    for docs in iter_document_pages(query, field_paths=field_paths, limiter=limiter):
+        for doc in docs:
+            path = doc.reference.path
+            parent = "/".join(path.split("/")[:-1])
+            size = document_name_size(path) + DOCUMENT_OVERHEAD_BYTES if count_only else estimate_document_size(path, doc.to_dict())
+            scan.add(parent, 1, size)
+        if job is not None:
+            job.advance(len(docs))
+    return scan
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
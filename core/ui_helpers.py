@@ -1,8 +1,12 @@
+import re
 from rich.table import Table
 from rich.console import Console
 from rich.panel import Panel
 console = Console()
 
+# Field names that need no backtick quoting in a Firestore field path
+_SIMPLE_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z_0-9]*$")
+
 def show_instructions():
     panel = Panel.fit(
         "[bold cyan]\n📘 Follow these steps to generate required credentials:\n[/bold cyan]\n"
@@ -30,12 +34,99 @@ def show_collections_table(collections):
         table.add_row(str(idx), coll.id if hasattr(coll, 'id') else str(coll))
     console.print(table)
 
-def show_documents_table(docs):
-    table = Table(title="[bold green]Documents[/bold green]", show_header=True, header_style="bold green")
+def is_basic_type(val):
+    return isinstance(val, (str, int, float, bool)) or val is None
+
+def summarize_dict_item(item):
+    if not isinstance(item, dict):
+        return str(item)
+    if 'title' in item:
+        return f"title: {item['title']}" + (f" (timestamp: {item.get('timestamp')})" if 'timestamp' in item else "")
+    if 'timestamp' in item:
+        return f"timestamp: {item['timestamp']}"
+    if 'content' in item:
+        content = item['content']
+        if isinstance(content, str):
+            return f"content: {content[:30]}..."
+    if item:
+        k, v = next(iter(item.items()))
+        return f"{k}: {str(v)[:30]}..."
+    return "[dict]"
+
+def split_field_path(field_path):
+    """'a.`b-c`.d' -> ['a', 'b-c', 'd']. Raises ValueError for empty or unterminated segments."""
+    parts, current, quoted, i = [], "", False, 0
+    while i < len(field_path):
+        char = field_path[i]
+        if quoted and char == "\\" and i + 1 < len(field_path):
+            current += field_path[i + 1]
+            i += 2
+            continue
+        if char == "`":
+            quoted = not quoted
+        elif char == "." and not quoted:
+            if not current:
+                raise ValueError(f"Empty segment in field path '{field_path}'.")
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+        i += 1
+    if quoted:
+        raise ValueError(f"Unterminated backtick in field path '{field_path}'.")
+    if not current:
+        raise ValueError(f"Empty segment in field path '{field_path}'.")
+    parts.append(current)
+    return parts
+
+def quote_field_path(parts):
+    # Same quoting the Firestore SDK expects: backticks around anything but simple names
+    return ".".join(
+        part if _SIMPLE_FIELD_NAME.match(part) else "`" + part.replace("\\", "\\\\").replace("`", "\\`") + "`"
+        for part in parts
+    )
+
+def parse_preview_fields(fields):
+    """Comma-separated string (or list) of field paths -> quoted field paths safe for select()."""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return [quote_field_path(split_field_path(f.strip())) for f in fields if f and f.strip()]
+
+def preview_value(doc, field_path, max_length=40):
+    try:
+        value = doc.get(field_path)
+    except KeyError:
+        return "[dim]-[/dim]"
+    if isinstance(value, dict):
+        text = summarize_dict_item(value)
+    elif isinstance(value, list):
+        text = f"[{len(value)} items]"
+    else:
+        text = str(value)
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+def show_documents_table(docs, preview_fields=None, title="Documents", start=1):
+    table = Table(title=f"[bold green]{title}[/bold green]", show_header=True, header_style="bold green")
+    table.add_column("#", style="dim", width=4)
+    table.add_column("Document ID", style="bold yellow")
+    for field_path in preview_fields or []:
+        table.add_column(field_path, style="cyan")
+    for idx, doc in enumerate(docs, start):
+        previews = [preview_value(doc, field_path) for field_path in preview_fields or []]
+        table.add_row(str(idx), doc.id if hasattr(doc, 'id') else str(doc), *previews)
+    console.print(table)
+
+def show_search_results_table(docs, preview_fields=None, title="Search Results", start=1):
+    # Hits come from many parents, so the parent path is shown instead of just the ID
+    table = Table(title=f"[bold green]{title}[/bold green]", show_header=True, header_style="bold green")
     table.add_column("#", style="dim", width=4)
+    table.add_column("Parent", style="dim")
     table.add_column("Document ID", style="bold yellow")
-    for idx, doc in enumerate(docs, 1):
-        table.add_row(str(idx), doc.id if hasattr(doc, 'id') else str(doc))
+    for field_path in preview_fields or []:
+        table.add_column(field_path, style="cyan")
+    for idx, doc in enumerate(docs, start):
+        previews = [preview_value(doc, field_path) for field_path in preview_fields or []]
+        table.add_row(str(idx), doc.reference.parent.path, doc.id, *previews)
     console.print(table)
 
 def show_fields_table(data):
@@ -122,4 +213,21 @@ def explore_data(value, path="root"):
     else:
         panel = Panel(f"[bold]{path}[/bold]: [green]{value}", title="Value", border_style="green")
         console.print(panel)
-        input("Press Enter to continue...") 
\ No newline at end of file
+        input("Press Enter to continue...")
+
+def show_scan_table(scan, title="Subtree Size", limit=15):
+    from firebase_cli_app.core.tree_scanner import format_bytes
+    table = Table(title=f"[bold red]{title}[/bold red]", show_header=True, header_style="bold red")
+    table.add_column("Collection Path", style="bold yellow")
+    table.add_column("Documents", justify="right")
+    table.add_column("Subtree Documents", justify="right")
+    table.add_column("Subtree Size", justify="right", style="yellow")
+    rows = scan.rows(limit)
+    for row in rows:
+        table.add_row(row["path"] or "/", str(row["documents"]), str(row["subtree_documents"]), format_bytes(row["subtree_bytes"]))
+    if not rows:
+        table.add_row("(empty)", "0", "0", "0 B")
+    elif len(scan.collections) > len(rows):
+        table.add_row(f"... {len(scan.collections) - len(rows)} more", "", "", "")
+    table.add_row("[bold]Total[/bold]", "", f"[bold]{scan.total_documents}[/bold]", f"[bold]{format_bytes(scan.total_bytes)}[/bold]")
+    console.print(table)
@@ -0,0 +1,62 @@
+from firebase_cli_app.core.audit import AuditLog, FirestoreAuditSink
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, doc_ref, data):
+        self._writes.append((doc_ref, data))
+
+    def commit(self):
+        if self._db.failures:
+            self._db.failures -= 1
+            raise RuntimeError("commit rejected")
+        for (collection, doc_id), data in self._writes:
+            self._db.stored[(collection, doc_id)] = data
+
+
+class FakeCollection:
+    def __init__(self, collection_id):
+        self.id = collection_id
+
+    def document(self, doc_id):
+        return (self.id, doc_id)
+
+
+class FakeFirestore:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.stored = {}
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, collection_id):
+        return FakeCollection(collection_id)
+
+
+def test_firestore_sink_returns_only_the_failed_tenants_entries():
+    clients = {"good": FakeFirestore(), "bad": FakeFirestore(failures=1)}
+    log = AuditLog(FirestoreAuditSink(clients.__getitem__, "audit"))
+    log.record("delete_document", tenant="good", target="users/a")
+    log.record("delete_document", tenant="bad", target="users/b")
+    batch = log._take_batch(None)
+    failed = log.sink.write(batch)
+    assert [entry["tenant"] for entry in failed] == ["bad"]
+    good_entry = next(entry for entry in batch if entry["tenant"] == "good")
+    assert clients["good"].stored == {("audit", good_entry["id"]): good_entry}
+    assert clients["bad"].stored == {}
+
+
+def test_retried_delivery_does_not_duplicate_entries():
+    # The second tenant fails once, so the batch is delivered twice
+    clients = {"good": FakeFirestore(), "bad": FakeFirestore(failures=1)}
+    log = AuditLog(FirestoreAuditSink(clients.__getitem__, "audit"))
+    for tenant in ("good", "bad", "good"):
+        log.record("update_document", tenant=tenant)
+    log._deliver(log._take_batch(None))
+    assert len(clients["good"].stored) == 2
+    assert len(clients["bad"].stored) == 1
+    assert log.failed == 0
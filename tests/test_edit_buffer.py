@@ -0,0 +1,20 @@
+from firebase_cli_app.core.edit_buffer import EditBuffer
+
+
+class RecordingDocRef:
+    def __init__(self):
+        self.payload = None
+
+    def update(self, payload, option=None):
+        self.payload = payload
+
+
+def test_commit_writes_dotted_names_as_literal_keys():
+    staged = EditBuffer()
+    staged.stage_set("profile.name", "x")
+    staged.stage_set("title", "t")
+    doc_ref = RecordingDocRef()
+    staged.commit(doc_ref)
+    # Same meaning as apply(): a top-level key called "profile.name", not the nested field
+    assert doc_ref.payload == {"`profile.name`": "x", "title": "t"}
+    assert staged.apply({"profile": {"name": "old"}}) == {"profile": {"name": "old"}, "profile.name": "x", "title": "t"}
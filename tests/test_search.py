@@ -0,0 +1,56 @@
+import pytest
+from firebase_cli_app.core.search import parse_filter, build_search_query, SearchFilterError
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ('status == "open"', ("status", "==", "open")),
+    ("score >= 10", ("score", ">=", 10)),
+    ("score>=10", ("score", ">=", 10)),
+    ("a<b", ("a", "<", "b")),
+    ("nested.field <= 3", ("nested.field", "<=", 3)),
+    ('tags array-contains "x"', ("tags", "array-contains", "x")),
+    ('tags array-contains-any ["a", "b"]', ("tags", "array-contains-any", ["a", "b"])),
+    ("x in [1, 2]", ("x", "in", [1, 2])),
+    ("x not-in [1]", ("x", "not-in", [1])),
+])
+def test_parse_filter(expression, expected):
+    assert parse_filter(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("pinned == true", ("pinned", "==", True)),
+    ("min_score >= 10", ("min_score", ">=", 10)),
+    ('login == "bob"', ("login", "==", "bob")),
+    ('domain != "a"', ("domain", "!=", "a")),
+    ('index in ["a"]', ("index", "in", ["a"])),
+])
+def test_parse_filter_field_names_containing_word_operators(expression, expected):
+    assert parse_filter(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["pinned", "x ==", "", "x in 3", 'tags array-contains-any "a"'])
+def test_parse_filter_rejects_invalid(expression):
+    with pytest.raises(SearchFilterError):
+        parse_filter(expression)
+
+
+def test_parse_filter_quotes_field_names():
+    assert parse_filter("user-name == 1") == ("`user-name`", "==", 1)
+    assert parse_filter("profile.first-name == \"a\"") == ("profile.`first-name`", "==", "a")
+
+
+@pytest.mark.parametrize("expression", [
+    'tags array-contains "x"',
+    'tags array-contains-any ["a", "b"]',
+    'x in [1, 2]',
+    'x not-in [1]',
+    'score >= 10',
+    'user-name == 1',
+])
+def test_build_search_query_accepts_every_operator(expression):
+    # A real SDK client: where() validates operators and field paths without any network call
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud import firestore
+    db = firestore.Client(project="test-project", credentials=AnonymousCredentials())
+    query = build_search_query(db, "messages", [parse_filter(expression)])
+    assert len(query._field_filters) == 1
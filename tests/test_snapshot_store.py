@@ -0,0 +1,100 @@
+import datetime
+from firebase_cli_app.core.snapshot_store import SnapshotStore, pull_collection, refresh_collection
+
+UPDATED = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeCollectionRef:
+    def __init__(self, collection_id):
+        self.id = collection_id
+
+
+class FakeDocumentRef:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.split("/")[-1]
+
+    def get(self):
+        return FakeSnapshot(self, self._db.docs.get(self.path))
+
+    def collections(self):
+        ids = {p.split("/")[-2] for p in self._db.docs if p.rsplit("/", 2)[0] == self.path}
+        return [FakeCollectionRef(collection_id) for collection_id in sorted(ids)]
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = UPDATED if data is not None else None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeQuery:
+    def __init__(self, db, path, limit=None, after=None):
+        self._db, self._path, self._limit, self._after = db, path, limit, after
+
+    def order_by(self, field_path, direction=None):
+        return self
+
+    def select(self, field_paths):
+        return self
+
+    def limit(self, count):
+        return FakeQuery(self._db, self._path, count, self._after)
+
+    def start_after(self, document):
+        return FakeQuery(self._db, self._path, self._limit, document.id)
+
+    def stream(self):
+        ids = sorted(p.split("/")[-1] for p in self._db.docs if p.rsplit("/", 1)[0] == self._path)
+        ids = [doc_id for doc_id in ids if self._after is None or doc_id > self._after][:self._limit]
+        return [FakeDocumentRef(self._db, f"{self._path}/{doc_id}").get() for doc_id in ids]
+
+
+class FakeFirestore:
+    """Just enough of a Firestore client for pull/refresh: documents keyed by full path."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def collection(self, path):
+        return FakeQuery(self, path)
+
+    def document(self, path):
+        return FakeDocumentRef(self, path)
+
+    def get_all(self, refs):
+        return [ref.get() for ref in refs]
+
+
+def test_refresh_keeps_subtrees_under_placeholder_parents(tmp_path):
+    # users/abc itself does not exist; only its chats subcollection does
+    db = FakeFirestore({"users/abc/chats/c1": {"text": "hi"}, "users/xyz": {"name": "x"}})
+    store = SnapshotStore(str(tmp_path / "snapshot.db"))
+    pull_collection(db, store, "users/abc/chats")
+    refresh_collection(db, store, "users", recursive=False)
+    assert store._document("users/abc/chats/c1") is not None
+    assert store._document("users/xyz") is not None
+
+
+def test_delete_subtree_treats_like_wildcards_literally(tmp_path):
+    # "_" is a LIKE wildcard, so a pattern match on users/user_1 would also catch users/userA1
+    db = FakeFirestore({
+        "users/user_1": {"name": "a"},
+        "users/user_1/chats/c1": {"text": "hi"},
+        "users/userA1": {"name": "b"},
+        "users/userA1/chats/c1": {"text": "yo"},
+    })
+    store = SnapshotStore(str(tmp_path / "snapshot.db"))
+    pull_collection(db, store, "users")
+    store.delete_subtree("users/user_1")
+    assert store._document("users/user_1") is None
+    assert store._document("users/user_1/chats/c1") is None
+    assert store._document("users/userA1") is not None
+    assert store._document("users/userA1/chats/c1") is not None
@@ -0,0 +1,20 @@
+from firebase_cli_app.core.tree_scanner import TreeScan
+
+
+def test_subtree_totals_roll_up_into_ancestor_collections_only():
+    scan = TreeScan()
+    scan.add("users", 2, 200)
+    scan.add("users/u1/chats", 3, 30)
+    scan.add("users/u1/chats/c1/messages", 5, 5)
+    scan.add("users/u2/chats", 1, 10)
+    # Shares a string prefix with "users" but is not inside it
+    scan.add("users_archive", 7, 700)
+    rows = {row["path"]: row for row in scan.rows()}
+    assert (rows["users"]["subtree_documents"], rows["users"]["subtree_bytes"]) == (11, 245)
+    assert (rows["users"]["documents"], rows["users"]["bytes"]) == (2, 200)
+    assert rows["users/u1/chats"]["subtree_documents"] == 8
+    assert rows["users/u1/chats/c1/messages"]["subtree_documents"] == 5
+    assert rows["users_archive"]["subtree_documents"] == 7
+    assert scan.subtree("users/u2/chats") == {"documents": 1, "bytes": 10}
+    assert [row["path"] for row in scan.rows(limit=2)] == ["users_archive", "users"]
+    assert (scan.total_documents, scan.total_bytes) == (18, 945)
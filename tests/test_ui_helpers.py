@@ -0,0 +1,25 @@
+import pytest
+from firebase_cli_app.core.ui_helpers import split_field_path, quote_field_path, parse_preview_fields
+
+
+@pytest.mark.parametrize("field_path, parts", [
+    ("name", ["name"]),
+    ("address.city", ["address", "city"]),
+    ("`user-name`", ["user-name"]),
+    ("meta.`a.b`.c", ["meta", "a.b", "c"]),
+    ("`tick\\`s`", ["tick`s"]),
+])
+def test_split_and_quote_round_trip(field_path, parts):
+    assert split_field_path(field_path) == parts
+    assert split_field_path(quote_field_path(parts)) == parts
+
+
+@pytest.mark.parametrize("field_path", ["", "a..b", "a.", "`x"])
+def test_split_field_path_rejects_malformed_paths(field_path):
+    with pytest.raises(ValueError):
+        split_field_path(field_path)
+
+
+def test_parse_preview_fields_quotes_names_the_sdk_would_reject():
+    assert parse_preview_fields("name, user-name, address.city,") == ["name", "`user-name`", "address.city"]
+    assert parse_preview_fields(["1st"]) == ["`1st`"]